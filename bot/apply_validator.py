@@ -0,0 +1,208 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import argparse
+import json
+import logging
+import sys
+from bot.job import Job, Portal
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures' / 'apply'
+
+def _headless_driver():
+    """Chrome without a window, for the local fixture wizards"""
+    from selenium import webdriver
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    options.add_argument('--window-size=1920,1080')
+    options.add_argument('--disable-notifications')
+    return webdriver.Chrome(options=options)
+
+def _dry_run_jobs(task):
+    """
+    Dry-run a batch of jobs in a worker process with a browser of its own
+    
+    Selenium is imported here so the parent process never loads it.
+    """
+    jobs, resume_path, credentials_file, headless = task
+    from selenium.common.exceptions import WebDriverException
+    from bot.job_applicator import JobApplicator
+    from bot.login_manager import LoginManager, LOGIN_METHODS
+    
+    login_manager = LoginManager(driver=_headless_driver() if headless else None)
+    applicator = JobApplicator(login_manager.driver, dry_run=True)
+    logged_in = set()
+    results = []
+    try:
+        for data in jobs:
+            job = Job.from_dict(data)
+            result = {'job_id': job.id, 'url': job.url, 'portal': job.portal.value, 'reached_submit': False,
+                      'duration': 0, 'step_timings': {}, 'field_map': {}, 'manual_fields': []}
+            if credentials_file and job.portal not in logged_in:
+                if not getattr(login_manager, LOGIN_METHODS[job.portal])(credentials_file):
+                    results.append(dict(result, error=f"login to {job.portal.value} failed"))
+                    continue
+                logged_in.add(job.portal)
+            try:
+                applicator.dry_run_result = None
+                applicator.apply_job(job, resume_path)
+                results.append(applicator.dry_run_result or dict(result, error='unsupported portal'))
+            except WebDriverException as e:
+                results.append(dict(result, error=str(e)))
+    finally:
+        login_manager.close()
+    return results
+
+def verdict(result, max_seconds):
+    """
+    Classify a dry run
+    
+    Returns:
+        str: 'ok', 'manual_fields' when required fields are left for a
+             human, 'timeout' when it took longer than max_seconds, or
+             'failed'
+    """
+    if result.get('error'):
+        return 'failed'
+    if result['manual_fields']:
+        return 'manual_fields'
+    if result['duration'] > max_seconds:
+        return 'timeout'
+    return 'ok' if result['reached_submit'] else 'failed'
+
+class ApplyValidator:
+    def __init__(self, resume_path, workers=4, max_seconds=90):
+        """
+        Runs the apply wizards in dry-run mode across parallel browsers
+        
+        Each worker process drives its own browser through a share of the
+        jobs and stops every wizard at the submit button, so nothing is
+        submitted and no application quota is used.
+        
+        Args:
+            resume_path (str): Resume uploaded in the wizards
+            workers (int): Browser processes to run in parallel
+            max_seconds (float): Dry runs slower than this count as timeouts
+        """
+        self.resume_path = str(Path(resume_path).resolve())
+        self.workers = workers
+        self.max_seconds = max_seconds
+        self._setup_logging()
+
+    def _setup_logging(self):
+        """Setup logging configuration"""
+        logging.basicConfig(
+            filename='logs/applicator.log',
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def _run(self, jobs, credentials_file=None, headless=False):
+        """Dry-run job dictionaries across the workers and classify each result"""
+        if not jobs:
+            return []
+        workers = min(self.workers, len(jobs))
+        tasks = [(jobs[index::workers], self.resume_path, credentials_file, headless) for index in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = [result for batch in executor.map(_dry_run_jobs, tasks) for result in batch]
+        for result in results:
+            result['verdict'] = verdict(result, self.max_seconds)
+        return results
+
+    def validate_fixtures(self, portals=None, repeat=1):
+        """
+        Check every apply method against the local fixture wizard of its portal
+        
+        Args:
+            portals (list): Portals to check, defaults to all
+            repeat (int): Runs per portal, to measure timing spread
+        
+        Returns:
+            list: Dry-run results with a verdict each
+        """
+        portals = [Portal(portal) for portal in portals] if portals else list(Portal)
+        jobs = [
+            {
+                'title': 'Data Analyst',
+                'company': 'Fixture Co',
+                'portal': portal.value,
+                'url': (FIXTURES_DIR / f"{portal.value}.html").resolve().as_uri(),
+            }
+            for portal in portals for _ in range(repeat)
+        ]
+        results = self._run(jobs, headless=True)
+        failed = [result for result in results if result['verdict'] != 'ok']
+        self.logger.info(f"Fixture validation: {len(results) - len(failed)} of {len(results)} dry runs passed")
+        return results
+
+    def precheck(self, jobs, credentials_file='config/credentials.json'):
+        """
+        Dry-run live job listings to find the ones not worth live-apply quota
+        
+        Args:
+            jobs (list): Job objects to check
+            credentials_file (str): Path to credentials JSON file
+        
+        Returns:
+            list: Dry-run results with a verdict each
+        """
+        jobs = [job for job in jobs if job.portal is not None]
+        return self._run([job.to_dict() for job in jobs], credentials_file)
+
+def _print_results(results):
+    for result in results:
+        steps = ', '.join(f"{step} {seconds:.1f}s" for step, seconds in result['step_timings'].items())
+        print(f"{result['portal']:<12} {result['verdict']:<14} {result['duration']:6.1f}s  {steps}")
+        for field in result['manual_fields']:
+            print(f"{'':<12} needs {field['type']} field '{field['label'] or field['name']}'")
+        if result.get('error'):
+            print(f"{'':<12} {result['error']}")
+
+def main(argv=None):
+    """Validate the apply wizards against fixtures, or pre-check queued jobs"""
+    parser = argparse.ArgumentParser(description='Dry-run the apply wizards without submitting')
+    parser.add_argument('command', choices=['fixtures', 'precheck'])
+    parser.add_argument('--portal', action='append', choices=[portal.value for portal in Portal])
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per fixture')
+    parser.add_argument('--limit', type=int, help='Queued jobs to pre-check')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--output', help='Write the results, including field maps, to this JSON file')
+    parser.add_argument('--config', default='config/config.json')
+    args = parser.parse_args(argv)
+    
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+    validation_config = config.get('validation', {})
+    validator = ApplyValidator(
+        config['resume_path'],
+        workers=args.workers or validation_config.get('workers', 4),
+        max_seconds=validation_config.get('max_seconds', 90)
+    )
+    
+    if args.command == 'fixtures':
+        results = validator.validate_fixtures(args.portal, args.repeat)
+    else:
+        from bot.work_queue import WorkQueue, QUEUED
+        work_queue = WorkQueue(config.get('queue', {}).get('db', 'data/work_queue.db'))
+        try:
+            jobs = [job for job, _, _ in work_queue.jobs(QUEUED)]
+            if args.portal:
+                jobs = [job for job in jobs if job.portal and job.portal.value in args.portal]
+            results = validator.precheck(jobs[:args.limit])
+            skipped = 0
+            for result in results:
+                if result['verdict'] in ('manual_fields', 'timeout'):
+                    skipped += work_queue.skip(result['job_id'], f"pre-check: {result['verdict']}")
+            print(f"Pre-checked {len(results)} queued jobs, skipped {skipped}")
+        finally:
+            work_queue.close()
+    
+    _print_results(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+    if args.command == 'fixtures' and any(result['verdict'] != 'ok' for result in results):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+import logging
+from bot.login_manager import LoginManager
+
+class PortalTab:
+    """
+    Driver stand-in bound to one tab of a shared browser
+
+    Every driver attribute is looked up on the shared driver after making
+    this tab the active window, so JobScraper, JobApplicator and
+    LoginManager can use a tab exactly like a whole driver. Quitting a tab
+    only closes the tab.
+    """
+
+    def __init__(self, session, portal, handle):
+        self.session = session
+        self.portal = portal
+        self.handle = handle
+
+    def __getattr__(self, name):
+        self.session.activate(self.handle)
+        return getattr(self.session.driver, name)
+
+    def quit(self):
+        """Close this tab, leaving the browser and other tabs running"""
+        self.session.close_tab(self.portal)
+
+    close = quit
+
+class BrowserSession:
+    def __init__(self, login_manager=None):
+        """
+        One warm browser hosting a tab per portal
+        
+        Args:
+            login_manager (LoginManager): Owner of the shared browser; a new
+                                          browser is started when not given
+        """
+        self.login_manager = login_manager or LoginManager()
+        self.tabs = {}
+        self._active = self.driver.current_window_handle
+        self._blank_handle = self._active
+        self._setup_logging()
+
+    def _setup_logging(self):
+        """Setup logging configuration"""
+        logging.basicConfig(
+            filename='logs/login.log',
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def driver(self):
+        return self.login_manager.driver
+
+    def activate(self, handle):
+        """Switch the browser to a tab, skipping the round trip if it is already active"""
+        if handle != self._active:
+            self.driver.switch_to.window(handle)
+            self._active = handle
+
+    def _open_window(self):
+        """Get a window handle for a new tab, reusing the browser's initial blank tab"""
+        if self._blank_handle:
+            handle, self._blank_handle = self._blank_handle, None
+            return handle
+        self.driver.switch_to.new_window('tab')
+        self._active = self.driver.current_window_handle
+        return self._active
+
+    def tab(self, portal):
+        """
+        Get the tab for a portal, opening it on first use
+        
+        Args:
+            portal (Portal): Portal the tab is used for
+        
+        Returns:
+            PortalTab: Driver stand-in bound to the portal's tab
+        """
+        if portal not in self.tabs:
+            self.tabs[portal] = PortalTab(self, portal, self._open_window())
+            self.logger.info(f"Opened {portal.value} tab")
+        return self.tabs[portal]
+
+    def login_manager_for(self, portal):
+        """Get a LoginManager that drives the portal's tab instead of a new browser"""
+        return LoginManager(driver=self.tab(portal))
+
+    def close_tab(self, portal):
+        """Close a portal's tab, keeping the browser alive for the others"""
+        tab = self.tabs.pop(portal, None)
+        if tab is None:
+            return
+        try:
+            if not self.tabs:
+                # Keep the last window open as the blank tab for later use
+                self.activate(tab.handle)
+                self.driver.get('about:blank')
+                self._blank_handle = tab.handle
+                return
+            self.activate(tab.handle)
+            self.driver.close()
+            self._active = None
+        except Exception as e:
+            self.logger.warning(f"Error closing {portal.value} tab: {str(e)}")
+
+    def rebind(self, driver):
+        """
+        Reopen every portal tab after the browser was replaced
+        
+        Called by DriverSupervisor. The PortalTab objects stay the same,
+        only their window handles change, so components holding a tab
+        keep working.
+        """
+        active_tab = next((tab for tab in self.tabs.values() if tab.handle == self._active), None)
+        self._active = driver.current_window_handle
+        self._blank_handle = self._active
+        for tab in self.tabs.values():
+            tab.handle = self._open_window()
+        if active_tab:
+            self.activate(active_tab.handle)
+
+    def close(self):
+        """Close the shared browser"""
+        self.tabs = {}
+        self.login_manager.close()
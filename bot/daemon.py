@@ -0,0 +1,351 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import date
+from bot.browser_session import BrowserSession
+from bot.driver_supervisor import DriverSupervisor
+from bot.job import Job, Portal
+from bot.job_applicator import JobApplicator
+from bot.job_scraper import JobScraper
+from bot.login_manager import LoginManager, LOGIN_METHODS
+from bot.portal_scheduler import PortalScheduler
+from bot.search_matrix import SearchMatrix, PORTAL_SEARCH
+from bot.work_queue import WorkQueue
+
+class LoginFailed(RuntimeError):
+    """Raised when a portal's tab could not be logged in"""
+
+class JobDaemon:
+    def __init__(self, config, credentials_file='config/credentials.json', search_state=None,
+                 history=None, snapshots=None, enricher=None):
+        """
+        Long-running bot process with a warm, logged-in browser
+        
+        Scheduled search-and-apply runs and ad-hoc requests are queued and
+        executed one at a time by a single worker thread, since the browser
+        can only do one thing at a time.
+        
+        Args:
+            config (dict): Bot configuration
+            credentials_file (str): Path to credentials JSON file
+            search_state (SearchState): Optional incremental search state
+            history (HistoryStore): Optional job and application history
+            snapshots (SnapshotStore): Optional page snapshot recorder
+            enricher (JobEnricher): Optional job description fetcher
+        """
+        self.config = config
+        self.daemon_config = config.get('daemon', {})
+        self.credentials_file = credentials_file
+        self.search_state = search_state
+        self.history = history
+        self.snapshots = snapshots
+        self.enricher = enricher
+        self.interval = self.daemon_config.get('interval_minutes', 60) * 60
+        self.portals = [Portal(portal) for portal in self.daemon_config.get('portals', ['linkedin', 'indeed'])]
+        scheduler_config = config.get('scheduler', {})
+        self.scheduler = PortalScheduler(
+            self.portals, history,
+            exploration=scheduler_config.get('exploration', 0.1),
+            half_life_hours=scheduler_config.get('half_life_hours', 72)
+        )
+        
+        self.tasks = queue.Queue()
+        self.session = None
+        self.supervisor = None
+        self.logged_in = set()
+        self.stopping = threading.Event()
+        self._browser_lock = threading.Lock()
+        
+        self.started_at = time.time()
+        self.current_task = None
+        self.next_run_at = None
+        self.last_run = None
+        self.applied_today = self.scheduler.applied_today()
+        self.applied_on = date.today()
+        self.completed_tasks = 0
+        self._setup_logging()
+
+    def _setup_logging(self):
+        """Setup logging configuration"""
+        logging.basicConfig(
+            filename='logs/daemon.log',
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def _ensure_browser(self):
+        """Start the shared browser on first use"""
+        if self.session is None:
+            self.session = BrowserSession()
+            self.supervisor = DriverSupervisor(
+                self.session.login_manager,
+                credentials_file=self.credentials_file,
+                **self.config.get('browser', {})
+            )
+            self.supervisor.bind(self.session, self)
+
+    def rebind(self, driver):
+        """The tabs follow a replacement browser through the BrowserSession"""
+
+    def session_lost(self):
+        """Called by the supervisor when a replacement browser kept none of the logins"""
+        self.logger.warning("Browser replaced without its logins, logging in again on next use")
+        self.logged_in.clear()
+
+    def _tab(self, portal):
+        """Get the portal's tab, logging in the first time it is used"""
+        self._ensure_browser()
+        tab = self.session.tab(portal)
+        if portal not in self.logged_in:
+            if not getattr(LoginManager(driver=tab), LOGIN_METHODS[portal])(self.credentials_file):
+                raise LoginFailed(f"Failed to login to {portal.value}")
+            self.logged_in.add(portal)
+        return tab
+
+    def _remaining_quota(self):
+        """Applications still allowed today under max_applications_per_day"""
+        if self.applied_on != date.today():
+            self.applied_on = date.today()
+            self.applied_today = 0
+        return self.config.get('max_applications_per_day', 50) - self.applied_today
+
+    def _apply(self, jobs, leftover=None):
+        """
+        Apply to jobs on their portals' tabs, stopping at the daily limit
+        
+        Jobs not applied to, because the run stopped, their portal could
+        not be logged in or the attempt failed before submitting, are added
+        to the leftover list if given.
+        """
+        if leftover is None:
+            leftover = []
+        applied = 0
+        pending = list(jobs)
+        try:
+            while pending:
+                if self.stopping.is_set() or self._remaining_quota() <= 0:
+                    break
+                job = pending.pop(0)
+                if job.portal is None:
+                    self.logger.warning(f"Unsupported job portal for URL: {job.url}")
+                    continue
+                try:
+                    tab = self._tab(job.portal)
+                except LoginFailed as e:
+                    self.logger.error(f"Skipping {job.url}: {str(e)}")
+                    leftover.append(job)
+                    continue
+                applicator = JobApplicator(tab, self.history, self.snapshots, progress=self.supervisor.progress)
+                started = time.time()
+                try:
+                    success = self.supervisor.run(applicator.apply_job, job, self.config['resume_path'])
+                except Exception:
+                    if not self.supervisor.submitting:
+                        leftover.append(job)
+                    raise
+                self.scheduler.record(job.portal, success, time.time() - started, applicator.step_timings)
+                if success:
+                    applied += 1
+                    self.applied_today += 1
+                elif not self.supervisor.submitting:
+                    leftover.append(job)
+                time.sleep(self.config.get('application_delay', 5))
+        finally:
+            # Jobs not reached, also when an error ended the run early
+            leftover.extend(pending)
+            if self.history:
+                self.history.flush()
+        return applied
+
+    def run_search(self):
+        """Search every configured portal and query, then apply to what was found"""
+        matrix = SearchMatrix(self.config, pool=None)
+        queries = [query for query in matrix.queries() if Portal(query[0]) in self.portals]
+        
+        results = []
+        candidates = None
+        planned = None
+        leftover = []
+        try:
+            for portal, keywords, location in queries:
+                try:
+                    tab = self._tab(Portal(portal))
+                except LoginFailed as e:
+                    self.logger.error(f"Skipping search for {keywords} in {location}: {str(e)}")
+                    continue
+                scraper = JobScraper(tab, self.search_state, self.snapshots)
+                jobs = getattr(scraper, PORTAL_SEARCH[portal][0])(keywords, location)
+                if self.history:
+                    self.history.record_jobs(jobs)
+                results.append(((portal, keywords, location), jobs))
+        
+            candidates = matrix.merge(results)
+            if self.enricher:
+                self.enricher.enrich(candidates)
+            # Spend today's remaining applications where they have been paying off
+            planned = self.scheduler.plan(candidates, self._remaining_quota())
+            planned_ids = {job.id for job in planned}
+            leftover.extend(job for job in candidates if job.id not in planned_ids)
+            applied = self._apply(planned, leftover)
+        finally:
+            if self.history:
+                self.history.flush()
+            # The search state has marked everything found as seen, so queue
+            # what was not applied to even if the run failed part way
+            if self.search_state:
+                if planned is None:
+                    leftover = candidates if candidates is not None else matrix.merge(results)
+                self._queue_leftovers(leftover)
+        self.last_run = {'finished_at': time.time(), 'found': len(candidates), 'applied': applied}
+        self.logger.info(f"Scheduled run found {len(candidates)} jobs and applied to {applied}")
+
+    def _queue_leftovers(self, jobs):
+        """Put jobs found but not applied to in the work queue, since the search state won't return them again"""
+        if not jobs:
+            return
+        work_queue = WorkQueue(self.config.get('queue', {}).get('db', 'data/work_queue.db'))
+        try:
+            added = work_queue.enqueue(jobs)
+        finally:
+            work_queue.close()
+        self.logger.info(f"Queued {added} jobs left over from the scheduled run")
+
+    def run_apply_urls(self, urls):
+        """Apply to an ad-hoc list of job URLs"""
+        applied = self._apply([Job(title='', company='', url=url) for url in urls])
+        self.logger.info(f"Ad-hoc run applied to {applied} of {len(urls)} jobs")
+
+    def submit(self, name, *args):
+        """Queue a task for the worker thread"""
+        self.tasks.put((name, args))
+
+    def _worker(self):
+        """Run queued tasks one at a time against the shared browser"""
+        while not self.stopping.is_set():
+            try:
+                name, args = self.tasks.get(timeout=1)
+            except queue.Empty:
+                continue
+            self.current_task = name
+            try:
+                with self._browser_lock:
+                    getattr(self, name)(*args)
+            except Exception as e:
+                self.logger.error(f"Error running {name}: {str(e)}")
+            finally:
+                self.current_task = None
+                self.completed_tasks += 1
+
+    def _scheduler(self):
+        """Queue a search run every interval"""
+        while not self.stopping.is_set():
+            self.submit('run_search')
+            self.next_run_at = time.time() + self.interval
+            self.stopping.wait(self.interval)
+
+    def is_healthy(self):
+        """Check that the worker is running and the browser, if started, responds"""
+        if not self._worker_thread.is_alive():
+            return False
+        if self.session is None:
+            return True
+        # A busy worker is using the browser; don't issue commands from another thread
+        if not self._browser_lock.acquire(blocking=False):
+            return True
+        try:
+            return self.supervisor.is_alive()
+        finally:
+            self._browser_lock.release()
+
+    def status(self):
+        """Summary of the daemon's state for the status endpoint"""
+        return {
+            'uptime': time.time() - self.started_at,
+            'current_task': self.current_task,
+            'queued_tasks': self.tasks.qsize(),
+            'completed_tasks': self.completed_tasks,
+            'next_run_at': self.next_run_at,
+            'last_run': self.last_run,
+            'applied_today': self.applied_today,
+            'browser_started': self.session is not None,
+            'logged_in': sorted(portal.value for portal in self.logged_in),
+            'browser_memory_mb': self.supervisor.memory_mb() if self.supervisor else None,
+            'portals': self.scheduler.stats(),
+        }
+
+    def serve(self):
+        """Start the worker and scheduler and serve the control API until shutdown"""
+        host = self.daemon_config.get('host', '127.0.0.1')
+        port = self.daemon_config.get('port', 8765)
+        
+        self._worker_thread = threading.Thread(target=self._worker, daemon=True)
+        self._worker_thread.start()
+        if self.daemon_config.get('schedule', True):
+            threading.Thread(target=self._scheduler, daemon=True).start()
+        
+        server = ThreadingHTTPServer((host, port), _ControlHandler)
+        server.job_daemon = self
+        self.logger.info(f"Daemon listening on http://{host}:{port}")
+        try:
+            server.serve_forever()
+        finally:
+            self.stopping.set()
+            server.server_close()
+            if self.session:
+                self.session.close()
+
+class _ControlHandler(BaseHTTPRequestHandler):
+    """Local HTTP control API of the daemon"""
+
+    def _send(self, code, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_GET(self):
+        daemon = self.server.job_daemon
+        if self.path == '/health':
+            healthy = daemon.is_healthy()
+            self._send(200 if healthy else 503, {'healthy': healthy})
+        elif self.path == '/status':
+            self._send(200, daemon.status())
+        else:
+            self._send(404, {'error': 'not found'})
+
+    def do_POST(self):
+        daemon = self.server.job_daemon
+        try:
+            body = self._read_json()
+        except ValueError:
+            self._send(400, {'error': 'invalid JSON'})
+            return
+        
+        if self.path == '/search':
+            daemon.submit('run_search')
+            self._send(202, {'queued': 'run_search'})
+        elif self.path == '/apply':
+            urls = body.get('urls')
+            if not isinstance(urls, list) or not urls:
+                self._send(400, {'error': 'expected {"urls": [...]}'})
+                return
+            daemon.submit('run_apply_urls', urls)
+            self._send(202, {'queued': 'run_apply_urls', 'jobs': len(urls)})
+        elif self.path == '/shutdown':
+            self._send(202, {'stopping': True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        else:
+            self._send(404, {'error': 'not found'})
+
+    def log_message(self, format, *args):
+        self.server.job_daemon.logger.info(f"{self.address_string()} {format % args}")
@@ -0,0 +1,258 @@
+from pathlib import Path
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+from bot.job import Job
+
+KNOWN_SKILLS = [
+    'Python', 'R', 'SQL', 'MySQL', 'PostgreSQL', 'MongoDB', 'Excel', 'VBA', 'Power BI', 'Tableau',
+    'Looker', 'Google Analytics', 'Pandas', 'NumPy', 'SciPy', 'Matplotlib', 'Seaborn', 'Scikit-learn',
+    'TensorFlow', 'PyTorch', 'Keras', 'Machine Learning', 'Deep Learning', 'NLP', 'Computer Vision',
+    'Statistics', 'Data Analysis', 'Data Visualization', 'Data Cleaning', 'ETL', 'Big Data', 'Spark',
+    'Hadoop', 'Airflow', 'AWS', 'Azure', 'GCP', 'Docker', 'Kubernetes', 'Git', 'Linux', 'Java',
+    'JavaScript', 'TypeScript', 'HTML', 'CSS', 'React', 'Node.js', 'Django', 'Flask', 'FastAPI',
+    'REST APIs', 'Selenium', 'Jupyter', 'Agile', 'Communication', 'Problem Solving',
+]
+
+SENIORITY_WORDS = {
+    'senior', 'sr', 'junior', 'jr', 'lead', 'principal', 'staff', 'head', 'intern', 'internship',
+    'trainee', 'associate', 'entry', 'level', 'fresher', 'i', 'ii', 'iii', 'iv', 'remote', 'hybrid',
+}
+
+COVER_LETTER_PLACEHOLDERS = {
+    '[Company Name]': '{company}',
+    '[Company]': '{company}',
+    '[Job Title]': '{title}',
+    '[Position]': '{title}',
+    '[Role]': '{title}',
+}
+
+FIELD_PATTERNS = {
+    'email': re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+'),
+    # Spaces only, so a number never runs on into the next line
+    'phone': re.compile(r'\+?\d[\d ().-]{8,}\d'),
+    'linkedin': re.compile(r'(?:https?://)?(?:www\.)?linkedin\.com/in/[\w-]+/?', re.I),
+    'github': re.compile(r'(?:https?://)?(?:www\.)?github\.com/[\w-]+/?', re.I),
+}
+
+# Bump when extraction changes so cached profiles and cover letters are rebuilt
+EXTRACTOR_VERSION = 2
+
+YEARS_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\+?\s*(?:years?|yrs?)', re.I)
+
+def content_hash(path):
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def extract_text(path):
+    """
+    Extract the text of a resume or cover letter
+
+    PDFs are read with pypdf, anything else as UTF-8 text.
+    """
+    if Path(path).suffix.lower() != '.pdf':
+        return Path(path).read_text(encoding='utf-8')
+    # Only needed on a cache miss
+    from pypdf import PdfReader
+    reader = PdfReader(str(path))
+    return '\n'.join(page.extract_text() or '' for page in reader.pages)
+
+def extract_skills(text):
+    """Known skills mentioned in a document, in the order they first appear"""
+    found = []
+    for skill in KNOWN_SKILLS:
+        # Single letters like 'R' only count in capitals and not as part of 'R&D'
+        flags = 0 if len(skill) == 1 else re.I
+        match = re.search(r'(?<![\w+#.&])' + re.escape(skill) + r'(?![\w+#&])', text, flags)
+        if match:
+            found.append((match.start(), skill))
+    return [skill for _, skill in sorted(found)]
+
+def extract_fields(text):
+    """Contact details, name and years of experience found in a document"""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    fields = {'name': lines[0] if lines else ''}
+    for field, pattern in FIELD_PATTERNS.items():
+        match = pattern.search(text)
+        fields[field] = match.group(0).strip() if match else ''
+    years = [float(value) for value in YEARS_PATTERN.findall(text)]
+    fields['years_of_experience'] = max(years) if years else 0
+    return fields
+
+def job_cluster(title):
+    """
+    Group job titles that would get the same cover letter
+
+    Seniority words and word order are ignored, so 'Senior Data Analyst'
+    and 'Data Analyst - Remote' fall into the same cluster.
+    """
+    tokens = re.findall(r'[a-z0-9+#]+', title.lower())
+    core = sorted({token for token in tokens if token not in SENIORITY_WORDS})
+    return ' '.join(core) or 'general'
+
+class DocumentCache:
+    def __init__(self, cache_dir='data/documents'):
+        """
+        On-disk cache of everything derived from the resume and cover letter
+        
+        Extracted text, skills and key fields are stored per file content
+        hash, and tailored cover letters per content hash and job cluster,
+        so each is computed once and later runs only read JSON.
+        
+        Args:
+            cache_dir (str): Directory holding the cached results
+        """
+        self.cache_dir = Path(cache_dir)
+        self._profiles = {}
+        self._hashes = {}
+        self._variants = {}
+        self._setup_logging()
+
+    def _setup_logging(self):
+        """Setup logging configuration"""
+        logging.basicConfig(
+            filename='logs/documents.log',
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def _hash(self, path):
+        """Content hash of a file, rehashed only when its size or mtime changes"""
+        stat = os.stat(path)
+        key = (str(path), stat.st_size, stat.st_mtime_ns)
+        if key not in self._hashes:
+            self._hashes[key] = content_hash(path)
+        return self._hashes[key]
+
+    def _read(self, path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=4)
+        tmp_path.replace(path)
+
+    def profile(self, path):
+        """
+        Get the text, skills and key fields of a document
+        
+        Args:
+            path (str): Path to a resume or cover letter
+        
+        Returns:
+            dict: 'hash', 'text', 'skills' and 'fields' of the document
+        """
+        digest = self._hash(path)
+        if digest in self._profiles:
+            return self._profiles[digest]
+        
+        cache_file = self.cache_dir / 'profiles' / f"{digest}.json"
+        profile = self._read(cache_file)
+        if profile is None or profile.get('version') != EXTRACTOR_VERSION:
+            text = extract_text(path)
+            profile = {
+                'version': EXTRACTOR_VERSION,
+                'hash': digest,
+                'text': text,
+                'skills': extract_skills(text),
+                'fields': extract_fields(text),
+            }
+            self._write(cache_file, profile)
+            self.logger.info(f"Extracted {path} ({len(profile['skills'])} skills)")
+        self._profiles[digest] = profile
+        return profile
+
+    def _tailor(self, letter, resume, cluster):
+        """Build the cover letter template for a job cluster"""
+        text = letter['text']
+        for placeholder, field in COVER_LETTER_PLACEHOLDERS.items():
+            text = text.replace(placeholder, field)
+        
+        # Lead with the skills named in the job title, then the rest of the resume
+        cluster_tokens = set(cluster.split())
+        skills = sorted(
+            resume['skills'],
+            key=lambda skill: not set(skill.lower().split()) <= cluster_tokens
+        )[:4]
+        if not skills:
+            return text
+        skill_list = skills[0] if len(skills) == 1 else f"{', '.join(skills[:-1])} and {skills[-1]}"
+        paragraph = f"My experience with {skill_list} is directly relevant to the {{title}} role at {{company}}."
+        
+        paragraphs = re.split(r'\n\s*\n', text.strip())
+        closing = next(
+            (index for index, part in enumerate(paragraphs)
+             if re.match(r'(sincerely|regards|best|thank|yours)', part.strip(), re.I)),
+            len(paragraphs)
+        )
+        paragraphs.insert(closing, paragraph)
+        return '\n\n'.join(paragraphs)
+
+    def cover_letter(self, job, cover_letter_path, resume_path):
+        """
+        Get a cover letter tailored to a job
+        
+        The tailored template is built once per job cluster and cached, so
+        this only fills in the job's title and company.
+        
+        Args:
+            job (Job): Job being applied to
+            cover_letter_path (str): Path to the base cover letter
+            resume_path (str): Path to the resume
+        
+        Returns:
+            str: Cover letter text
+        """
+        letter = self.profile(cover_letter_path)
+        resume = self.profile(resume_path)
+        cluster = job_cluster(job.title)
+        key = hashlib.sha256(f"{EXTRACTOR_VERSION}:{letter['hash']}:{resume['hash']}:{cluster}".encode('utf-8')).hexdigest()
+        
+        template = self._variants.get(key)
+        if template is None:
+            cache_file = self.cache_dir / 'cover_letters' / f"{key}.json"
+            cached = self._read(cache_file)
+            if cached is None:
+                cached = {'cluster': cluster, 'template': self._tailor(letter, resume, cluster)}
+                self._write(cache_file, cached)
+                self.logger.info(f"Generated cover letter for cluster '{cluster}'")
+            template = self._variants[key] = cached['template']
+        
+        return template.replace('{title}', job.title).replace('{company}', job.company)
+
+def main(argv=None):
+    """Show what was extracted from the resume or a tailored cover letter"""
+    parser = argparse.ArgumentParser(description='Cached resume and cover letter processing')
+    parser.add_argument('command', choices=['profile', 'cover-letter'])
+    parser.add_argument('--title', default='', help='Job title for cover-letter')
+    parser.add_argument('--company', default='', help='Company for cover-letter')
+    parser.add_argument('--config', default='config/config.json')
+    args = parser.parse_args(argv)
+
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+    cache = DocumentCache(config.get('documents_dir', 'data/documents'))
+
+    if args.command == 'profile':
+        profile = cache.profile(config['resume_path'])
+        print(json.dumps({'skills': profile['skills'], 'fields': profile['fields']}, indent=4))
+        return
+    job = Job(title=args.title, company=args.company, url='')
+    print(cache.cover_letter(job, config['cover_letter_path'], config['resume_path']))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+from selenium.common.exceptions import WebDriverException
+import logging
+import statistics
+import time
+import psutil
+
+class DriverSupervisor:
+    def __init__(self, login_manager, login_method=None, credentials_file='config/credentials.json',
+                 recycle_after_applications=25, max_memory_mb=2048, slowdown_factor=2.0,
+                 page_load_timeout=60):
+        """
+        Keeps a long-running browser session healthy
+        
+        Monitors the memory of the browser and renderer processes and the
+        latency of each apply step. The driver is recycled after a number
+        of applications, above a memory threshold or once the steps have
+        slowed down well past their pace on the fresh browser, and replaced
+        if it crashes or hangs.
+        Cookies are carried over so the new browser stays logged in.
+        
+        Args:
+            login_manager (LoginManager): Owner of the supervised driver
+            login_method (str): LoginManager method used to log in again if
+                                cookies cannot be restored, e.g. 'login_linkedin'
+            credentials_file (str): Path to credentials JSON file
+            recycle_after_applications (int): Applications before a recycle
+            max_memory_mb (int): Browser memory in MB that triggers a recycle
+            slowdown_factor (float): Recycle when recent apply steps are this
+                                     many times slower than on a fresh browser
+            page_load_timeout (int): Seconds before a page load counts as hung
+        """
+        self.login_manager = login_manager
+        self.login_method = login_method
+        self.credentials_file = credentials_file
+        self.recycle_after_applications = recycle_after_applications
+        self.max_memory_mb = max_memory_mb
+        self.slowdown_factor = slowdown_factor
+        self.page_load_timeout = page_load_timeout
+        self._components = []
+        self._last_cookies = None
+        self.submitting = False
+        self._step_started = time.time()
+        self._steps_reported = False
+        self._reset_stats()
+        self._setup_logging()
+        self._configure_driver()
+
+    def _setup_logging(self):
+        """Setup logging configuration"""
+        logging.basicConfig(
+            filename='logs/login.log',
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def _reset_stats(self):
+        """Clear the per-driver counters after starting a new browser"""
+        self.applications = 0
+        # Seconds per apply step, keyed by step name
+        self.latencies = {}
+
+    def _configure_driver(self):
+        """Bound page loads and scripts so a hung renderer raises instead of blocking"""
+        try:
+            self.driver.set_page_load_timeout(self.page_load_timeout)
+            self.driver.set_script_timeout(self.page_load_timeout)
+        except WebDriverException as e:
+            self.logger.warning(f"Could not set driver timeouts: {str(e)}")
+
+    @property
+    def driver(self):
+        return self.login_manager.driver
+
+    def bind(self, *components):
+        """
+        Register objects holding a reference to the driver
+        
+        Their driver attribute is updated whenever the driver is replaced.
+        Components with a rebind(driver) method, such as a BrowserSession,
+        are handed the new driver through it instead. Components with a
+        session_lost() method are told when the new browser could not be
+        logged in, so they can log in again themselves.
+        """
+        for component in components:
+            if not hasattr(component, 'rebind'):
+                component.driver = self.driver
+            self._components.append(component)
+
+    def memory_mb(self):
+        """
+        Total resident memory of chromedriver, the browser and its renderers
+        
+        Returns:
+            float: Memory in MB, or None if it cannot be measured
+        """
+        try:
+            root = psutil.Process(self.driver.service.process.pid)
+            processes = [root] + root.children(recursive=True)
+            total = 0
+            for process in processes:
+                try:
+                    total += process.memory_info().rss
+                except psutil.Error:
+                    continue
+            return total / (1024 * 1024)
+        except (AttributeError, psutil.Error):
+            return None
+
+    def is_alive(self):
+        """Check that the browser still responds to commands"""
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except WebDriverException:
+            return False
+
+    def _is_slow(self):
+        """
+        Check whether recent steps are much slower than on the fresh browser
+        
+        Each step is only compared with earlier runs of the same step, so a
+        long wizard after short ones does not look like a slowdown. The
+        median over the steps decides, so one slow page does not either.
+        """
+        ratios = []
+        for samples in self.latencies.values():
+            if len(samples) < 6:
+                continue
+            baseline = statistics.median(samples[:3])
+            if baseline > 0:
+                ratios.append(statistics.mean(samples[-3:]) / baseline)
+        return bool(ratios) and statistics.median(ratios) > self.slowdown_factor
+
+    def progress(self, job, step):
+        """
+        Progress callback for JobApplicator
+        
+        Records the time each apply step took, measured between the
+        applicator's step reports like its own step_timings. Remembers in
+        submitting when the current work got as far as submitting, after
+        which it must not be run again.
+        """
+        now = time.time()
+        if step == 'submitting':
+            self.submitting = True
+            return
+        self.latencies.setdefault(step, []).append(now - self._step_started)
+        self._step_started = now
+        self._steps_reported = True
+
+    def run(self, operation, *args, **kwargs):
+        """
+        Run one unit of work, such as a single application, under supervision
+        
+        If the browser crashed or hung during the work, it is replaced. The
+        work is retried once on the new browser only if it failed before
+        reaching submit, so the caller's loop carries on with the same item
+        without ever submitting an application twice. Anything past that
+        point is left to the caller and the loop moves on to the next item.
+        
+        The apply methods catch their own errors and return False, so a
+        crash is detected by checking the browser afterwards rather than
+        by the exception.
+        
+        Args:
+            operation (callable): Work to run against the current driver
+        
+        Returns:
+            Result of the operation, or None if it raised on both attempts
+        """
+        result = None
+        self.submitting = False
+        for attempt in range(2):
+            started = self._step_started = time.time()
+            self._steps_reported = False
+            try:
+                result = operation(*args, **kwargs)
+            except WebDriverException as e:
+                self.logger.error(f"Driver error during supervised work: {str(e)}")
+                result = None
+            
+            if self.is_alive():
+                # Work that reports no steps is timed as a whole
+                if not self._steps_reported:
+                    self.latencies.setdefault('operation', []).append(time.time() - started)
+                self.applications += 1
+                # Keep the latest cookies in case the browser dies later
+                self._last_cookies = self._capture_cookies() or self._last_cookies
+                self.checkpoint()
+                return result
+            
+            self.logger.warning("Browser crashed or hung, replacing driver")
+            self.replace(restore_url=False)
+            if result or self.submitting:
+                self.logger.warning("Work had already reached submit, not retrying it")
+                return result
+        return result
+
+    def checkpoint(self):
+        """Recycle the driver if it has done enough work, grown too large or slowed down"""
+        reason = None
+        if self.applications >= self.recycle_after_applications:
+            reason = f"{self.applications} applications"
+        elif self._is_slow():
+            reason = "page latency degraded"
+        else:
+            memory = self.memory_mb()
+            if memory is not None and memory > self.max_memory_mb:
+                reason = f"memory at {memory:.0f} MB"
+        
+        if reason:
+            self.logger.info(f"Recycling browser: {reason}")
+            self.replace()
+
+    def _capture_cookies(self):
+        """Get the cookies of every domain from the browser"""
+        try:
+            return self.driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+        except Exception:
+            try:
+                return self.driver.get_cookies()
+            except Exception:
+                return None
+
+    def _restore_cookies(self, cookies):
+        """Load previously captured cookies into the current browser"""
+        try:
+            self.driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+            return True
+        except Exception as e:
+            self.logger.warning(f"Could not restore cookies: {str(e)}")
+            return False
+
+    def replace(self, restore_url=True):
+        """
+        Start a fresh browser in place of the current one
+        
+        Cookies are copied over when the old browser still responds, and
+        otherwise the session logs in again. The current page is reopened
+        when restore_url is set.
+        """
+        cookies = self._capture_cookies() or self._last_cookies
+        current_url = None
+        if restore_url:
+            try:
+                current_url = self.driver.current_url
+            except Exception:
+                current_url = None
+        
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        
+        self.login_manager.driver = self.login_manager._setup_driver()
+        self._configure_driver()
+        self._reset_stats()
+        for component in self._components:
+            if hasattr(component, 'rebind'):
+                component.rebind(self.driver)
+            else:
+                component.driver = self.driver
+        
+        logged_in = bool(cookies and self._restore_cookies(cookies))
+        if not logged_in and self.login_method:
+            logged_in = getattr(self.login_manager, self.login_method)(self.credentials_file)
+        if not logged_in:
+            for component in self._components:
+                if hasattr(component, 'session_lost'):
+                    component.session_lost()
+        
+        if current_url and current_url.startswith('http'):
+            try:
+                self.driver.get(current_url)
+            except WebDriverException as e:
+                self.logger.warning(f"Could not reopen {current_url}: {str(e)}")
+        
+        self.logger.info("Browser replaced")
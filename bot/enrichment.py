@@ -0,0 +1,175 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import hashlib
+import json
+import logging
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bot.job_parser import parse_job_description
+
+USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+
+class DetailCache:
+    def __init__(self, cache_dir='data/details'):
+        """
+        On-disk cache of job detail pages, keyed by URL
+        
+        Stores the parsed description together with the ETag and
+        Last-Modified validators the server sent, so the page can be
+        revalidated with a conditional request.
+        
+        Args:
+            cache_dir (str): Directory holding the cached entries
+        """
+        self.cache_dir = Path(cache_dir)
+
+    def _path(self, url):
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.json"
+
+    def get(self, url):
+        """Get the cached entry of a URL, or None"""
+        try:
+            with open(self._path(url), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, url, entry):
+        """Store the entry of a URL"""
+        path = self._path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        tmp_path.replace(path)
+
+class JobEnricher:
+    def __init__(self, cache_dir='data/details', max_workers=8, per_portal=4, max_age_hours=24, timeout=15):
+        """
+        Fills in job descriptions by fetching detail pages over plain HTTP
+        
+        Pages are fetched concurrently through one pooled session instead
+        of a driver.get per job. Entries younger than max_age_hours are
+        used without any request, older ones are revalidated with
+        If-None-Match / If-Modified-Since, so an unchanged posting costs a
+        304.
+        
+        Args:
+            cache_dir (str): Directory of the detail page cache
+            max_workers (int): Requests in flight in total
+            per_portal (int): Requests in flight per portal
+            max_age_hours (float): Age below which cached pages are not revalidated
+            timeout (int): Request timeout in seconds
+        """
+        self.cache = DetailCache(cache_dir)
+        self.max_workers = max_workers
+        self.per_portal = per_portal
+        self.max_age = max_age_hours * 3600
+        self.timeout = timeout
+        self._portal_slots = {}
+        self._lock = threading.Lock()
+        self.session = self._setup_session()
+        self._setup_logging()
+
+    def _setup_logging(self):
+        """Setup logging configuration"""
+        logging.basicConfig(
+            filename='logs/scraper.log',
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def _setup_session(self):
+        """HTTP session with a connection pool sized for the workers and retries on throttling"""
+        session = requests.Session()
+        retry = Retry(total=2, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=['GET'], respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=self.max_workers, max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({'User-Agent': USER_AGENT, 'Accept-Language': 'en-US,en;q=0.9'})
+        return session
+
+    def _slot(self, portal):
+        """Semaphore bounding the concurrent requests to one portal"""
+        with self._lock:
+            if portal not in self._portal_slots:
+                self._portal_slots[portal] = threading.Semaphore(self.per_portal)
+            return self._portal_slots[portal]
+
+    def _fetch(self, job):
+        """
+        Get the description of one job, from the cache where possible
+        
+        Returns:
+            tuple: (description, outcome) where outcome is 'cached',
+                   'not_modified', 'fetched' or 'failed'
+        """
+        cached = self.cache.get(job.url)
+        if cached and time.time() - cached['fetched_at'] < self.max_age:
+            return cached['description'], 'cached'
+        
+        headers = {}
+        if cached and cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+        
+        try:
+            with self._slot(job.portal):
+                response = self.session.get(job.url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            self.logger.warning(f"Could not fetch details of {job.url}: {str(e)}")
+            return (cached['description'] if cached else ''), 'failed'
+        
+        if response.status_code == 304 and cached:
+            cached['fetched_at'] = time.time()
+            self.cache.put(job.url, cached)
+            return cached['description'], 'not_modified'
+        if response.status_code != 200:
+            self.logger.warning(f"Details of {job.url} returned HTTP {response.status_code}")
+            return (cached['description'] if cached else ''), 'failed'
+        
+        description = parse_job_description(response.text, job.portal)
+        self.cache.put(job.url, {
+            'url': job.url,
+            'description': description,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+        })
+        return description, 'fetched'
+
+    def enrich(self, jobs):
+        """
+        Fill in the description of every job
+        
+        Args:
+            jobs (list): List of Job objects, updated in place
+        
+        Returns:
+            list: The same jobs
+        """
+        fetchable = [job for job in jobs if job.url and job.portal]
+        started = time.time()
+        outcomes = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for job, (description, outcome) in zip(fetchable, executor.map(self._fetch, fetchable)):
+                if description:
+                    job.description = description
+                outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        
+        summary = ', '.join(f"{count} {outcome}" for outcome, count in sorted(outcomes.items()))
+        self.logger.info(f"Enriched {len(fetchable)} jobs in {time.time() - started:.1f}s ({summary})")
+        return jobs
+
+    def close(self):
+        self.session.close()
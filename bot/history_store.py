@@ -0,0 +1,302 @@
+import argparse
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+
+JOBS_SCHEMA = pa.schema([
+    ('scraped_at', pa.timestamp('s')),
+    ('job_id', pa.string()),
+    ('portal', pa.dictionary(pa.int8(), pa.string())),
+    ('title', pa.string()),
+    ('company', pa.dictionary(pa.int32(), pa.string())),
+    ('location', pa.dictionary(pa.int32(), pa.string())),
+    ('url', pa.string()),
+])
+
+APPLICATIONS_SCHEMA = pa.schema([
+    ('applied_at', pa.timestamp('s')),
+    ('job_id', pa.string()),
+    ('portal', pa.dictionary(pa.int8(), pa.string())),
+    ('title', pa.string()),
+    ('company', pa.dictionary(pa.int32(), pa.string())),
+    ('success', pa.bool_()),
+    ('duration', pa.float64()),
+    ('step_timings', pa.map_(pa.string(), pa.float64())),
+    ('error', pa.string()),
+])
+
+# A compaction lock older than this belongs to a process that died
+STALE_LOCK_SECONDS = 600
+
+class HistoryStore:
+    def __init__(self, root='data/history', batch_size=20, jobs_batch_size=500, max_parts=32):
+        """
+        Append-only columnar history of scraped jobs and application outcomes
+        
+        Each table is a directory of Arrow IPC files. Writes add a new file,
+        reads memory-map every file, so reports over months of runs do not
+        have to parse any JSON. Once a table has more than max_parts files
+        they are merged into one, so reads stay fast however long the bot
+        has been running.
+        
+        Args:
+            root (str): Directory holding the history tables
+            batch_size (int): Number of application outcomes buffered
+                              before they are written to disk
+            jobs_batch_size (int): Number of scraped jobs buffered before
+                                   they are written to disk
+            max_parts (int): Part files a table may have before it is
+                             compacted automatically
+        """
+        self.root = Path(root)
+        self.batch_size = batch_size
+        self.jobs_batch_size = jobs_batch_size
+        self.max_parts = max_parts
+        self._pending = []
+        self._pending_jobs = []
+        self._lock = threading.Lock()
+        self._setup_logging()
+
+    def _setup_logging(self):
+        """Setup logging configuration"""
+        logging.basicConfig(
+            filename='logs/history.log',
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def _write(self, table_name, table):
+        """Write a table as a new part file of the named history table"""
+        table_dir = self.root / table_name
+        table_dir.mkdir(parents=True, exist_ok=True)
+        part = table_dir / f"part-{int(time.time())}-{uuid.uuid4().hex[:8]}.arrow"
+        tmp_part = part.with_suffix('.tmp')
+        with pa.OSFile(str(tmp_part), 'wb') as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        tmp_part.replace(part)
+
+    def _parts(self, table_name):
+        """Part files of the named history table"""
+        return sorted((self.root / table_name).glob('part-*.arrow'))
+
+    def _read(self, table_name, schema):
+        """Memory-map and concatenate every part file of the named history table"""
+        for attempt in range(5):
+            tables = []
+            try:
+                for part in self._parts(table_name):
+                    with pa.memory_map(str(part), 'r') as source:
+                        tables.append(ipc.open_file(source).read_all())
+                break
+            except FileNotFoundError:
+                # A compaction replaced the parts while they were listed;
+                # its merged file holds the same rows, so list them again
+                continue
+        if not tables:
+            return schema.empty_table()
+        # Part files encode dictionary columns independently
+        return pa.concat_tables(tables).unify_dictionaries()
+
+    def _compact_table(self, table_name):
+        """
+        Merge the part files of one table into a single file
+        
+        A lock file keeps two processes from merging the same parts, which
+        would duplicate their rows. If another process holds it, this one
+        leaves the compaction to it.
+        """
+        lock = self.root / table_name / 'compact.lock'
+        try:
+            if time.time() - lock.stat().st_mtime > STALE_LOCK_SECONDS:
+                lock.unlink()
+        except FileNotFoundError:
+            pass
+        try:
+            os.close(os.open(str(lock), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return
+        try:
+            parts = self._parts(table_name)
+            if len(parts) < 2:
+                return
+            tables = []
+            for part in parts:
+                with pa.memory_map(str(part), 'r') as source:
+                    tables.append(ipc.open_file(source).read_all())
+            self._write(table_name, pa.concat_tables(tables).unify_dictionaries().combine_chunks())
+            for part in parts:
+                part.unlink()
+            self.logger.info(f"Compacted {len(parts)} {table_name} part files")
+        finally:
+            lock.unlink(missing_ok=True)
+
+    def _append(self, table_name, table):
+        """Write a new part file, compacting the table once it has too many"""
+        self._write(table_name, table)
+        if len(self._parts(table_name)) > self.max_parts:
+            self._compact_table(table_name)
+
+    def record_jobs(self, jobs, scraped_at=None):
+        """
+        Record a batch of scraped jobs
+        
+        Args:
+            jobs (list): Job objects found by a search
+            scraped_at (float): Unix timestamp of the search, defaults to now
+        """
+        if not jobs:
+            return
+        scraped_at = int(scraped_at or time.time())
+        with self._lock:
+            self._pending_jobs.extend(
+                {
+                    'scraped_at': scraped_at,
+                    'job_id': job.id,
+                    'portal': job.portal.value if job.portal else None,
+                    'title': job.title,
+                    'company': job.company,
+                    'location': job.location,
+                    'url': job.url,
+                }
+                for job in jobs
+            )
+            if len(self._pending_jobs) < self.jobs_batch_size:
+                return
+        self.flush()
+
+    def record_application(self, job, success, started_at, step_timings=None, error=None):
+        """
+        Record the outcome of one application attempt
+        
+        Args:
+            job (Job): Job that was applied to
+            success (bool): Whether the application was submitted
+            started_at (float): Unix timestamp at which the attempt started
+            step_timings (dict): Seconds spent in each apply step
+            error (str): Error message for failed attempts
+        """
+        with self._lock:
+            self._pending.append({
+                'applied_at': int(started_at),
+                'job_id': job.id,
+                'portal': job.portal.value if job.portal else None,
+                'title': job.title,
+                'company': job.company,
+                'success': bool(success),
+                'duration': time.time() - started_at,
+                'step_timings': list((step_timings or {}).items()),
+                'error': error,
+            })
+            if len(self._pending) < self.batch_size:
+                return
+        self.flush()
+
+    def flush(self):
+        """Write any buffered scraped jobs and application outcomes to disk"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            pending_jobs, self._pending_jobs = self._pending_jobs, []
+        if pending_jobs:
+            try:
+                self._append('jobs', pa.Table.from_pylist(pending_jobs, schema=JOBS_SCHEMA))
+            except Exception as e:
+                self.logger.error(f"Error recording scraped jobs: {str(e)}")
+        if pending:
+            try:
+                self._append('applications', pa.Table.from_pylist(pending, schema=APPLICATIONS_SCHEMA))
+            except Exception as e:
+                self.logger.error(f"Error recording application outcomes: {str(e)}")
+
+    def jobs(self):
+        """Get every recorded scraped job as an Arrow table"""
+        return self._read('jobs', JOBS_SCHEMA)
+
+    def applications(self):
+        """Get every recorded application outcome as an Arrow table"""
+        return self._read('applications', APPLICATIONS_SCHEMA)
+
+    def compact(self):
+        """Merge the part files of each table into one to keep reads fast"""
+        self.flush()
+        for table_name in ('jobs', 'applications'):
+            if (self.root / table_name).exists():
+                self._compact_table(table_name)
+
+    def success_rate(self, by='portal'):
+        """
+        Application success rate grouped by a column
+        
+        Args:
+            by (str): Column to group by, 'portal' or 'company'
+        
+        Returns:
+            pandas.DataFrame: attempts, successes and success_rate per group
+        """
+        applications = self.applications()
+        applications = applications.set_column(
+            applications.schema.get_field_index('success'), 'success',
+            pc.cast(applications['success'], pa.int64())
+        )
+        stats = applications.group_by(by).aggregate([('success', 'count'), ('success', 'sum')])
+        df = stats.to_pandas().rename(columns={'success_count': 'attempts', 'success_sum': 'successes'})
+        df['success_rate'] = df['successes'] / df['attempts']
+        return df.sort_values('attempts', ascending=False).reset_index(drop=True)
+
+    def time_to_apply(self):
+        """
+        Time from first seeing a job to successfully applying, per portal
+        
+        Returns:
+            pandas.DataFrame: Median and mean hours to apply per portal
+        """
+        first_seen = self.jobs().group_by('job_id').aggregate([('scraped_at', 'min')])
+        applied = self.applications().filter(pc.field('success'))
+        joined = applied.select(['job_id', 'portal', 'applied_at']).join(first_seen, 'job_id')
+        df = joined.to_pandas()
+        df['hours_to_apply'] = (df['applied_at'] - df['scraped_at_min']).dt.total_seconds() / 3600
+        return df.groupby('portal', observed=True)['hours_to_apply'].agg(['count', 'median', 'mean']).reset_index()
+
+    def duplicate_rate(self):
+        """
+        Share of scraped rows that were postings already seen before, per portal
+        
+        Returns:
+            pandas.DataFrame: scraped rows, unique jobs and duplicate_rate per portal
+        """
+        jobs = self.jobs().select(['portal', 'job_id'])
+        stats = jobs.group_by('portal').aggregate([('job_id', 'count'), ('job_id', 'count_distinct')])
+        df = stats.to_pandas().rename(columns={'job_id_count': 'scraped', 'job_id_count_distinct': 'unique'})
+        df['duplicate_rate'] = 1 - df['unique'] / df['scraped']
+        return df.sort_values('scraped', ascending=False).reset_index(drop=True)
+
+REPORTS = {
+    'success': lambda store, args: store.success_rate(by=args.by),
+    'time-to-apply': lambda store, args: store.time_to_apply(),
+    'duplicates': lambda store, args: store.duplicate_rate(),
+}
+
+def main(argv=None):
+    """Print a report over the recorded job history"""
+    parser = argparse.ArgumentParser(description='Reports over past job search and application runs')
+    parser.add_argument('report', choices=list(REPORTS) + ['compact'])
+    parser.add_argument('--by', choices=['portal', 'company'], default='portal',
+                        help='Grouping for the success report')
+    parser.add_argument('--history-dir', default='data/history')
+    args = parser.parse_args(argv)
+
+    store = HistoryStore(args.history_dir)
+    if args.report == 'compact':
+        store.compact()
+        return
+    print(REPORTS[args.report](store, args).to_string(index=False))
+
+if __name__ == '__main__':
+    main()
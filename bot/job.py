@@ -0,0 +1,146 @@
+from enum import Enum
+from urllib.parse import urlparse, parse_qs
+import re
+import sys
+
+# Patterns used to pull a stable posting ID out of a job URL, per portal
+JOB_ID_PATTERNS = {
+    'linkedin': re.compile(r'/jobs/view/(?:[^/]*?-)?(\d+)'),
+    'naukri': re.compile(r'-(\d{6,})(?:[/?]|$)'),
+    'internshala': re.compile(r'(\d{6,})(?:[/?]|$)'),
+}
+
+class Portal(Enum):
+    LINKEDIN = 'linkedin'
+    INDEED = 'indeed'
+    INTERNSHALA = 'internshala'
+    NAUKRI = 'naukri'
+
+    @classmethod
+    def from_url(cls, url):
+        """
+        Detect the portal a job URL belongs to
+        
+        Args:
+            url (str): URL of the job listing
+        
+        Returns:
+            Portal: Matching portal, or None for unsupported sites
+        """
+        host = urlparse(url or '').netloc.lower()
+        for portal in cls:
+            if f"{portal.value}." in host:
+                return portal
+        return None
+
+def job_id_from_url(url):
+    """
+    Derive a stable job ID from a job listing URL
+
+    Args:
+        url (str): URL of the job listing
+
+    Returns:
+        str: Portal-prefixed job ID, or the URL without its query string
+             when no known ID pattern matches
+    """
+    if not url:
+        return None
+
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+
+    if 'indeed.' in host:
+        query = parse_qs(parsed.query)
+        for key in ('jk', 'vjk'):
+            if query.get(key):
+                return f"indeed:{query[key][0]}"
+
+    for portal, pattern in JOB_ID_PATTERNS.items():
+        if portal in host:
+            match = pattern.search(parsed.path)
+            if match:
+                return f"{portal}:{match.group(1)}"
+
+    return f"{host}{parsed.path}".rstrip('/')
+
+class Job:
+    """
+    A single job posting found on one of the portals
+
+    Company and location strings are interned, since large result sets
+    repeat the same few values many times.
+    """
+
+    __slots__ = ('id', 'portal', 'title', 'company', 'location', 'url', 'matched_queries', 'description')
+
+    def __init__(self, title, company, url, location='', portal=None, matched_queries=None, description=''):
+        """
+        Args:
+            title (str): Job title
+            company (str): Hiring company
+            url (str): URL of the job listing
+            location (str): Job location
+            portal (Portal): Portal the job was found on; detected from the
+                             URL when not given
+            matched_queries (list): [keywords, location] pairs of the
+                                    searches that returned this job
+            description (str): Full job description, filled in by enrichment
+        """
+        self.title = (title or '').strip()
+        self.company = sys.intern((company or '').strip())
+        self.location = sys.intern((location or '').strip())
+        self.url = url
+        self.portal = Portal(portal) if portal else Portal.from_url(url)
+        self.id = job_id_from_url(url)
+        self.matched_queries = matched_queries if matched_queries is not None else []
+        self.description = description or ''
+
+    def __eq__(self, other):
+        return isinstance(other, Job) and self.id == other.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"Job({self.id!r}, {self.title!r}, {self.company!r})"
+
+    def to_dict(self):
+        """Convert the job to a JSON-serializable dictionary"""
+        data = {
+            'id': self.id,
+            'portal': self.portal.value if self.portal else None,
+            'title': self.title,
+            'company': self.company,
+            'location': self.location,
+            'url': self.url
+        }
+        if self.matched_queries:
+            data['matched_queries'] = self.matched_queries
+        if self.description:
+            data['description'] = self.description
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create a job from a dictionary
+        
+        Accepts both the current format and older saved job files, which
+        used 'link' instead of 'url' for most portals.
+        
+        Args:
+            data (dict): Job dictionary
+        
+        Returns:
+            Job: Parsed job
+        """
+        return cls(
+            title=data.get('title'),
+            company=data.get('company'),
+            url=data.get('url') or data.get('link'),
+            location=data.get('location'),
+            portal=data.get('portal'),
+            matched_queries=data.get('matched_queries'),
+            description=data.get('description')
+        )
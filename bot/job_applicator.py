@@ -6,10 +6,50 @@ import logging
 import time
 import json
 from pathlib import Path
+from bot.job import Job, Portal
+
+# Every visible form field on the page, in a single round trip
+FORM_FIELDS_SCRIPT = """
+return Array.from(document.querySelectorAll('input, select, textarea'))
+    .filter(e => !['hidden', 'submit', 'button', 'reset', 'image'].includes(e.type))
+    .map(e => ({
+        name: e.name || e.id || '',
+        type: e.type || e.tagName.toLowerCase(),
+        label: e.getAttribute('aria-label') || (e.labels && e.labels.length ? e.labels[0].innerText.trim() : ''),
+        required: e.required || e.getAttribute('aria-required') === 'true',
+        filled: (e.type === 'checkbox' || e.type === 'radio') ? e.checked : Boolean(e.value)
+    }));
+"""
 
 class JobApplicator:
-    def __init__(self, driver):
+    def __init__(self, driver, history=None, snapshots=None, progress=None, dry_run=False):
+        """
+        Args:
+            driver: Selenium WebDriver used for applying
+            history (HistoryStore): Optional store that records the outcome
+                                    and step timings of each application
+            snapshots (SnapshotStore): Optional store that records the page
+                                       source after each apply step
+            progress (callable): Optional progress(job, step) callback, called
+                                 after each apply step and with 'submitting'
+                                 right before the application is submitted
+            dry_run (bool): Walk each apply wizard up to the submit button
+                            without clicking it. The form fields seen at
+                            every step are recorded in field_map and the
+                            outcome in dry_run_result instead of history.
+        """
         self.driver = driver
+        self.history = history
+        self.snapshots = snapshots
+        self.progress = progress
+        self.dry_run = dry_run
+        self.dry_run_result = None
+        self.field_map = {}
+        self.step_timings = {}
+        self.last_error = None
+        self._portal = None
+        self._job = None
+        self._step_started = time.time()
         self._setup_logging()
         
     def _setup_logging(self):
@@ -21,6 +61,111 @@ class JobApplicator:
         )
         self.logger = logging.getLogger(__name__)
 
+    def _start_steps(self, portal):
+        """Reset the step timings for a new application on the given portal"""
+        self.step_timings = {}
+        self.field_map = {}
+        self._portal = portal
+        self._step_started = time.time()
+
+    def _mark_step(self, step):
+        """Record the time spent since the previous step under the given name"""
+        now = time.time()
+        self.step_timings[step] = now - self._step_started
+        if self.snapshots:
+            try:
+                self.snapshots.save('apply', self._portal, self.driver.current_url, self.driver.page_source)
+            except Exception as e:
+                self.logger.warning(f"Could not capture {step} page: {str(e)}")
+        if self.dry_run:
+            self.field_map[step] = self._form_fields()
+        self._report(step)
+        self._step_started = time.time()
+
+    def _form_fields(self):
+        """Name, type, label and required/filled state of each form field on the page"""
+        try:
+            return self.driver.execute_script(FORM_FIELDS_SCRIPT) or []
+        except Exception as e:
+            self.logger.warning(f"Could not read form fields: {str(e)}")
+            return []
+
+    def _stop_before_submit(self):
+        """End a dry run at the submit button, recording the final step"""
+        self._mark_step('review')
+        self.logger.info(f"Dry run reached the submit step of {self.driver.current_url}")
+        return True
+
+    def _manual_fields(self, fields):
+        """Required fields left empty, with a radio group counting as filled if any option is"""
+        answered_groups = {field['name'] for field in fields if field['type'] == 'radio' and field['filled']}
+        return [
+            field for field in fields
+            if field['required'] and not field['filled']
+            and not (field['type'] == 'radio' and field['name'] in answered_groups)
+        ]
+
+    def _fail(self, message):
+        """Log why an application failed and keep the reason for the history"""
+        self.logger.error(message)
+        self.last_error = message.strip().splitlines()[0] if message.strip() else message
+        return False
+
+    def _report(self, step):
+        """Pass the current application's progress to the progress callback"""
+        if self.progress and self._job:
+            self.progress(self._job, step)
+
+    def apply_job(self, job, resume_path):
+        """
+        Apply to a job on whichever portal it was found on
+        
+        Args:
+            job (Job): Job to apply to
+            resume_path (str): Path to resume file
+        
+        Returns:
+            bool: True if application successful, False otherwise
+        """
+        apply_methods = {
+            Portal.LINKEDIN: self.apply_linkedin_job,
+            Portal.INDEED: self.apply_indeed_job,
+            Portal.INTERNSHALA: self.apply_internshala_job,
+            Portal.NAUKRI: self.apply_naukri_job,
+        }
+        apply_method = apply_methods.get(job.portal)
+        if apply_method is None:
+            self.logger.warning(f"Unsupported job portal for URL: {job.url}")
+            return False
+        
+        started_at = time.time()
+        self._job = job
+        self.last_error = None
+        try:
+            success = apply_method(job.url, resume_path)
+        finally:
+            self._job = None
+        
+        if self.dry_run:
+            # Required fields still empty where the wizard stopped need a human
+            final_fields = self.field_map.get('review', []) if success else self._form_fields()
+            self.dry_run_result = {
+                'job_id': job.id,
+                'url': job.url,
+                'portal': job.portal.value,
+                'reached_submit': success,
+                'duration': time.time() - started_at,
+                'step_timings': dict(self.step_timings),
+                'field_map': dict(self.field_map),
+                'manual_fields': self._manual_fields(final_fields),
+            }
+            return success
+        
+        if self.history:
+            error = None if success else self.last_error or 'application failed'
+            self.history.record_application(job, success, started_at, self.step_timings, error)
+        return success
+
     def apply_linkedin_job(self, job_url, resume_path):
         """
         Apply to a job on LinkedIn
@@ -33,9 +178,12 @@ class JobApplicator:
             bool: True if application successful, False otherwise
         """
         try:
+            self._start_steps(Portal.LINKEDIN)
+            
             # Navigate to job listing
             self.driver.get(job_url)
             time.sleep(2)
+            self._mark_step('open_listing')
             
             # Click Easy Apply button
             easy_apply_button = WebDriverWait(self.driver, 10).until(
@@ -50,6 +198,7 @@ class JobApplicator:
             )
             next_button.click()
             time.sleep(2)
+            self._mark_step('contact_info')
 
             # Handle resume page
             try:
@@ -61,6 +210,7 @@ class JobApplicator:
                 time.sleep(2)
             except NoSuchElementException:
                 self.logger.info("Resume upload not required, continuing...")
+            self._mark_step('resume')
 
             # Handle additional questions
             try:
@@ -79,6 +229,7 @@ class JobApplicator:
                 time.sleep(2)
             except NoSuchElementException:
                 self.logger.info("No additional questions found, continuing...")
+            self._mark_step('questions')
 
             # Handle review page
             try:
@@ -90,21 +241,26 @@ class JobApplicator:
                 submit_button = WebDriverWait(self.driver, 10).until(
                     EC.presence_of_element_located((By.CSS_SELECTOR, "button[aria-label='Submit application']"))
                 )
+                if self.dry_run:
+                    return self._stop_before_submit()
+                self._report('submitting')
                 submit_button.click()
                 time.sleep(2)
+                self._mark_step('submit')
                 
                 self.logger.info(f"Successfully applied to job: {job_url}")
                 return True
             
             except (TimeoutException, NoSuchElementException) as e:
-                self.logger.error(f"Failed to submit application: {str(e)}")
-                # Refresh the page if submission fails
-                self.driver.refresh()
+                self._fail(f"Failed to submit application: {str(e)}")
+                # Refresh the page if submission fails, except in a dry run,
+                # where the stuck form is inspected afterwards
+                if not self.dry_run:
+                    self.driver.refresh()
                 return False
                 
         except Exception as e:
-            self.logger.error(f"Error applying to job: {str(e)}")
-            return False
+            return self._fail(f"Error applying to job: {str(e)}")
 
     def apply_indeed_job(self, job_url, resume_path):
         """
@@ -118,9 +274,12 @@ class JobApplicator:
             bool: True if application successful, False otherwise
         """
         try:
+            self._start_steps(Portal.INDEED)
+            
             # Navigate to job listing
             self.driver.get(job_url)
             time.sleep(2)
+            self._mark_step('open_listing')
             
             # Click Apply Now button
             apply_button = WebDriverWait(self.driver, 10).until(
@@ -136,6 +295,7 @@ class JobApplicator:
                 EC.presence_of_element_located((By.ID, "indeedapply-iframe"))
             )
             self.driver.switch_to.frame(iframe)
+            self._mark_step('open_form')
             
             # Upload resume if requested
             try:
@@ -144,6 +304,7 @@ class JobApplicator:
                 time.sleep(2)
             except NoSuchElementException:
                 self.logger.info("No resume upload field found")
+            self._mark_step('resume')
             
             # Click through application steps
             while True:
@@ -160,18 +321,20 @@ class JobApplicator:
                         submit_button = WebDriverWait(self.driver, 5).until(
                             EC.presence_of_element_located((By.CSS_SELECTOR, "button[data-testid='submit-button']"))
                         )
+                        if self.dry_run:
+                            return self._stop_before_submit()
+                        self._report('submitting')
                         submit_button.click()
+                        self._mark_step('submit')
                         break
                     except TimeoutException:
-                        self.logger.error("Could not find Continue or Submit button")
-                        return False
+                        return self._fail("Could not find Continue or Submit button")
             
             self.logger.info(f"Successfully applied to job: {job_url}")
             return True
             
         except Exception as e:
-            self.logger.error(f"Error applying to Indeed job: {str(e)}")
-            return False
+            return self._fail(f"Error applying to Indeed job: {str(e)}")
 
     def apply_internshala_job(self, job_url, resume_path):
         """
@@ -185,9 +348,12 @@ class JobApplicator:
             bool: True if application successful, False otherwise
         """
         try:
+            self._start_steps(Portal.INTERNSHALA)
+            
             # Navigate to job listing
             self.driver.get(job_url)
             time.sleep(2)
+            self._mark_step('open_listing')
             
             # Click Apply Now button
             apply_button = WebDriverWait(self.driver, 10).until(
@@ -204,18 +370,22 @@ class JobApplicator:
                 time.sleep(2)
             except TimeoutException:
                 self.logger.info("No resume upload field found on Internshala")
+            self._mark_step('resume')
             
             # Submit application
             submit_button = self.driver.find_element(By.ID, "submit_application")
+            if self.dry_run:
+                return self._stop_before_submit()
+            self._report('submitting')
             submit_button.click()
             
             time.sleep(2)
+            self._mark_step('submit')
             self.logger.info(f"Successfully applied to Internshala job: {job_url}")
             return True
             
         except Exception as e:
-            self.logger.error(f"Error applying to Internshala job: {str(e)}")
-            return False
+            return self._fail(f"Error applying to Internshala job: {str(e)}")
 
     def apply_naukri_job(self, job_url, resume_path):
         """
@@ -229,9 +399,12 @@ class JobApplicator:
             bool: True if application successful, False otherwise
         """
         try:
+            self._start_steps(Portal.NAUKRI)
+            
             # Navigate to job listing
             self.driver.get(job_url)
             time.sleep(2)
+            self._mark_step('open_listing')
             
             # Click Apply button
             apply_button = WebDriverWait(self.driver, 10).until(
@@ -248,18 +421,22 @@ class JobApplicator:
                 time.sleep(2)
             except TimeoutException:
                 self.logger.info("No resume upload field found on Naukri")
+            self._mark_step('resume')
             
             # Submit application
             submit_button = self.driver.find_element(By.CLASS_NAME, "submit-button")
+            if self.dry_run:
+                return self._stop_before_submit()
+            self._report('submitting')
             submit_button.click()
             
             time.sleep(2)
+            self._mark_step('submit')
             self.logger.info(f"Successfully applied to Naukri job: {job_url}")
             return True
             
         except Exception as e:
-            self.logger.error(f"Error applying to Naukri job: {str(e)}")
-            return False
+            return self._fail(f"Error applying to Naukri job: {str(e)}")
 
     def bulk_apply(self, jobs_file, resume_path):
         """
@@ -271,22 +448,15 @@ class JobApplicator:
         """
         try:
             with open(jobs_file, 'r') as f:
-                jobs = json.load(f)
+                jobs = [Job.from_dict(job) for job in json.load(f)]
             
             successful_applications = 0
             for job in jobs:
-                if 'linkedin.com' in job['link']:
-                    success = self.apply_linkedin_job(job['link'], resume_path)
-                elif 'indeed.com' in job['link']:
-                    success = self.apply_indeed_job(job['link'], resume_path)
-                elif 'internshala.com' in job['link']:
-                    success = self.apply_internshala_job(job['link'], resume_path)
-                elif 'naukri.com' in job['link']:
-                    success = self.apply_naukri_job(job['link'], resume_path)
-                else:
-                    self.logger.warning(f"Unsupported job portal for URL: {job['link']}")
+                if job.portal is None:
+                    self.logger.warning(f"Unsupported job portal for URL: {job.url}")
                     continue
                 
+                success = self.apply_job(job, resume_path)
                 if success:
                     successful_applications += 1
                 time.sleep(5)  # Wait between applications to avoid being flagged
@@ -295,3 +465,6 @@ class JobApplicator:
             
         except Exception as e:
             self.logger.error(f"Error during bulk application: {str(e)}")
+        finally:
+            if self.history:
+                self.history.flush()
@@ -0,0 +1,121 @@
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+from bot.job import Job, Portal
+
+def _text(element):
+    """Visible text of an element, with whitespace collapsed"""
+    return ' '.join(element.get_text(' ', strip=True).split())
+
+def _parse_cards(html, base_url, portal, card_class, title_class, company_class, location_class=None, link_selector=None):
+    """
+    Parse the job cards of a search results page
+
+    Cards missing any of the required fields are skipped.
+
+    Args:
+        html (str): Page source of the search results page
+        base_url (str): URL of the page, used to resolve relative links
+        portal (Portal): Portal the page belongs to
+        card_class (str): CSS class of a job card
+        title_class (str): CSS class of the job title inside a card
+        company_class (str): CSS class of the company name inside a card
+        location_class (str): CSS class of the location inside a card
+        link_selector (str): CSS selector of the job link inside the title,
+                             when the title element is not the link itself
+
+    Returns:
+        list: List of Job objects
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    jobs = []
+    for card in soup.find_all(class_=card_class):
+        title = card.find(class_=title_class)
+        company = card.find(class_=company_class)
+        location = card.find(class_=location_class) if location_class else None
+        link = title.select_one(link_selector) if title and link_selector else title
+        if not title or not company or not link or (location_class and not location):
+            continue
+        if not link.get('href'):
+            continue
+        
+        jobs.append(Job(
+            title=_text(title),
+            company=_text(company),
+            location=_text(location) if location else '',
+            url=urljoin(base_url, link['href']),
+            portal=portal
+        ))
+    return jobs
+
+def parse_linkedin_jobs(html, base_url='https://www.linkedin.com/jobs/'):
+    """Parse the job cards of a LinkedIn search results page"""
+    return _parse_cards(
+        html, base_url, Portal.LINKEDIN,
+        card_class='job-card-container',
+        title_class='job-card-list__title',
+        company_class='job-card-container__company-name',
+        location_class='job-card-container__metadata-item'
+    )
+
+def parse_indeed_jobs(html, base_url='https://www.indeed.com/jobs'):
+    """Parse the job cards of an Indeed search results page"""
+    return _parse_cards(
+        html, base_url, Portal.INDEED,
+        card_class='job_seen_beacon',
+        title_class='jobTitle',
+        company_class='companyName',
+        link_selector='a'
+    )
+
+def parse_internshala_jobs(html, base_url='https://internshala.com/jobs/'):
+    """Parse the job cards of an Internshala search results page"""
+    return _parse_cards(
+        html, base_url, Portal.INTERNSHALA,
+        card_class='job_card',
+        title_class='job_title',
+        company_class='company_name',
+        location_class='location_link'
+    )
+
+def parse_naukri_jobs(html, base_url='https://www.naukri.com/'):
+    """Parse the job cards of a Naukri search results page"""
+    return _parse_cards(
+        html, base_url, Portal.NAUKRI,
+        card_class='jobTuple',
+        title_class='title',
+        company_class='companyInfo',
+        location_class='location'
+    )
+
+# Containers of the full description on each portal's job detail page, most specific first
+DESCRIPTION_SELECTORS = {
+    Portal.LINKEDIN: ['.show-more-less-html__markup', '.jobs-description__content', '.description__text'],
+    Portal.INDEED: ['#jobDescriptionText'],
+    Portal.INTERNSHALA: ['.internship_details', '.text-container'],
+    Portal.NAUKRI: ['.job-desc', '[class*="dang-inner-html"]'],
+}
+
+def parse_job_description(html, portal):
+    """
+    Extract the full description from a job detail page
+
+    Args:
+        html (str): Page source of the job detail page
+        portal (Portal): Portal the page belongs to
+
+    Returns:
+        str: Description text, or an empty string if none was found
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    for selector in DESCRIPTION_SELECTORS.get(portal, []):
+        element = soup.select_one(selector)
+        if element:
+            return _text(element)
+    return ''
+
+SEARCH_PARSERS = {
+    Portal.LINKEDIN: parse_linkedin_jobs,
+    Portal.INDEED: parse_indeed_jobs,
+    Portal.INTERNSHALA: parse_internshala_jobs,
+    Portal.NAUKRI: parse_naukri_jobs,
+}
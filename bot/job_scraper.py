@@ -1,16 +1,49 @@
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.common.keys import Keys
 import logging
 import time
 import json
+import math
 from pathlib import Path
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+from bot.job import Portal
+from bot.job_parser import SEARCH_PARSERS
+
+# Date filter values accepted by each portal, in days
+INDEED_FROMAGE_DAYS = [1, 3, 7, 14]
+NAUKRI_JOB_AGE_DAYS = [1, 3, 7, 15, 30]
+
+def _with_query_params(url, **params):
+    """Return url with the given query parameters added or replaced"""
+    parsed = urlparse(url)
+    query = dict(parse_qsl(parsed.query))
+    query.update({key: str(value) for key, value in params.items()})
+    return urlunparse(parsed._replace(query=urlencode(query)))
+
+def _round_up_days(seconds, allowed_days):
+    """Round a look-back window up to the nearest day filter a portal supports"""
+    days = max(1, math.ceil(seconds / 86400))
+    for allowed in allowed_days:
+        if days <= allowed:
+            return allowed
+    return None
 
 class JobScraper:
-    def __init__(self, driver):
+    def __init__(self, driver, search_state=None, snapshots=None):
+        """
+        Args:
+            driver: Selenium WebDriver used for scraping
+            search_state (SearchState): Optional state of previous runs; when
+                                        given, searches run incrementally and
+                                        return only jobs not seen before
+            snapshots (SnapshotStore): Optional store that records the page
+                                       source of every results page parsed
+        """
         self.driver = driver
+        self.search_state = search_state
+        self.snapshots = snapshots
         self._setup_logging()
         
     def _setup_logging(self):
@@ -22,6 +55,73 @@ class JobScraper:
         )
         self.logger = logging.getLogger(__name__)
 
+    def _lookback_seconds(self, portal, keywords, location):
+        """
+        Get the date filter window for an incremental search
+        
+        Returns:
+            int: Seconds to look back, or None to run a full search
+        """
+        if not self.search_state:
+            return None
+        elapsed = self.search_state.seconds_since_last_run(portal, keywords, location)
+        if elapsed is None:
+            return None
+        # Allow an hour of slack for postings that are indexed late
+        return elapsed + 3600
+
+    def _parse_page(self, portal):
+        """
+        Parse the job cards on the current results page
+        
+        The page source is fetched once and parsed locally, rather than
+        querying the browser for every field of every card.
+        
+        Args:
+            portal (Portal): Portal the page belongs to
+        
+        Returns:
+            list: Jobs parsed from the page
+        """
+        html = self.driver.page_source
+        url = self.driver.current_url
+        if self.snapshots:
+            self.snapshots.save('search', portal, url, html)
+        return SEARCH_PARSERS[portal](html, url)
+
+    def _collect_page(self, query, page_jobs, jobs, run_ids):
+        """
+        Add the jobs found on one page or scroll step to the results
+        
+        Args:
+            query (tuple): (portal, keywords, location) of the search
+            page_jobs (list): Jobs parsed from the page
+            jobs (list): Results collected so far, extended in place
+            run_ids (set): IDs already processed during this run
+        
+        Returns:
+            bool: True if the page was mostly known jobs and paging should stop
+        """
+        page_ids = []
+        for job in page_jobs:
+            if job.id in run_ids:
+                continue
+            run_ids.add(job.id)
+            page_ids.append(job.id)
+            if self.search_state and job.id in self.search_state.seen_ids(*query):
+                continue
+            jobs.append(job)
+        
+        if self.search_state and self.search_state.is_mostly_known(*query, page_ids):
+            self.logger.info(f"Stopping {query[0]} search early: page is mostly known jobs")
+            return True
+        return False
+
+    def _record_run(self, query, run_ids, started_at):
+        """Store the IDs seen by an incremental search"""
+        if self.search_state:
+            self.search_state.record_run(*query, list(run_ids), started_at)
+
     def search_linkedin_jobs(self, keywords, location):
         """
         Search for jobs on LinkedIn based on keywords and location
@@ -31,9 +131,12 @@ class JobScraper:
             location (str): Job location
             
         Returns:
-            list: List of job dictionaries containing details
+            list: List of Job objects
         """
         try:
+            query = ('linkedin', keywords, location)
+            started_at = time.time()
+            
             # Navigate to LinkedIn Jobs
             self.driver.get('https://www.linkedin.com/jobs/')
             
@@ -56,28 +159,26 @@ class JobScraper:
             # Wait for job results to load
             time.sleep(3)
             
+            # Only show postings since the last run in incremental mode
+            lookback = self._lookback_seconds(*query)
+            if lookback:
+                self.driver.get(_with_query_params(self.driver.current_url, f_TPR=f"r{lookback}"))
+                time.sleep(3)
+            
             jobs = []
+            run_ids = set()
             # Scroll through job listings to load more
             for _ in range(5):  # Adjust range based on how many jobs you want to scrape
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
                 time.sleep(2)
                 
                 # Get all job cards
-                job_cards = self.driver.find_elements(By.CLASS_NAME, "job-card-container")
-                
-                for card in job_cards:
-                    try:
-                        job_info = {
-                            'title': card.find_element(By.CLASS_NAME, "job-card-list__title").text,
-                            'company': card.find_element(By.CLASS_NAME, "job-card-container__company-name").text,
-                            'location': card.find_element(By.CLASS_NAME, "job-card-container__metadata-item").text,
-                            'link': card.find_element(By.CLASS_NAME, "job-card-list__title").get_attribute('href')
-                        }
-                        if job_info not in jobs:  # Avoid duplicates
-                            jobs.append(job_info)
-                    except NoSuchElementException:
-                        continue
+                page_jobs = self._parse_page(Portal.LINKEDIN)
             
+                if self._collect_page(query, page_jobs, jobs, run_ids):
+                    break
+            
+            self._record_run(query, run_ids, started_at)
             self.logger.info(f"Found {len(jobs)} jobs on LinkedIn")
             return jobs
             
@@ -94,47 +195,45 @@ class JobScraper:
             location (str): Job location
             
         Returns:
-            list: List of job dictionaries with title, company, url
+            list: List of Job objects
         """
         try:
+            query = ('indeed', keywords, location)
+            started_at = time.time()
+            
             # Format search URL
             search_query = f"{keywords}".replace(' ', '+')
             search_location = f"{location}".replace(' ', '+')
             search_url = f"https://www.indeed.com/jobs?q={search_query}&l={search_location}&sc=0kf%3Aattr(DSQF7)%3B"
             
+            # Only show postings since the last run in incremental mode
+            lookback = self._lookback_seconds(*query)
+            fromage = _round_up_days(lookback, INDEED_FROMAGE_DAYS) if lookback else None
+            if fromage:
+                search_url += f"&fromage={fromage}"
+            
             # Navigate to search results
             self.driver.get(search_url)
             time.sleep(2)
             
             jobs = []
+            run_ids = set()
             pages_scraped = 0
             max_pages = 3  # Limit number of pages to scrape
             
             while pages_scraped < max_pages:
-                # Find all job cards
-                job_cards = WebDriverWait(self.driver, 10).until(
+                # Wait for job cards
+                WebDriverWait(self.driver, 10).until(
                     EC.presence_of_all_elements_located((By.CLASS_NAME, "job_seen_beacon"))
                 )
                 
                 # Extract job information
-                for card in job_cards:
-                    try:
-                        title_elem = card.find_element(By.CLASS_NAME, "jobTitle")
-                        company_elem = card.find_element(By.CLASS_NAME, "companyName")
-                        url_elem = title_elem.find_element(By.TAG_NAME, "a")
-                        
-                        job = {
-                            'title': title_elem.text,
-                            'company': company_elem.text,
-                            'url': url_elem.get_attribute('href'),
-                            'source': 'Indeed'
-                        }
-                        
-                        jobs.append(job)
-                        self.logger.info(f"Found Indeed job: {job['title']} at {job['company']}")
-                        
-                    except NoSuchElementException:
-                        continue
+                page_jobs = self._parse_page(Portal.INDEED)
+                for job in page_jobs:
+                    self.logger.info(f"Found Indeed job: {job.title} at {job.company}")
+                
+                if self._collect_page(query, page_jobs, jobs, run_ids):
+                    break
                 
                 # Try to go to next page
                 try:
@@ -147,6 +246,7 @@ class JobScraper:
                 except:
                     break
             
+            self._record_run(query, run_ids, started_at)
             self.logger.info(f"Found {len(jobs)} jobs on Indeed")
             return jobs
             
@@ -163,9 +263,12 @@ class JobScraper:
             location (str): Job location
             
         Returns:
-            list: List of job dictionaries containing details
+            list: List of Job objects
         """
         try:
+            query = ('internshala', keywords, location)
+            started_at = time.time()
+            
             # Navigate to Internshala jobs page
             self.driver.get('https://internshala.com/jobs/work-from-home')
             time.sleep(2)
@@ -181,26 +284,18 @@ class JobScraper:
             time.sleep(3)
             
             jobs = []
+            run_ids = set()
             # Scroll and collect job listings
             for _ in range(5):
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
                 time.sleep(2)
                 
-                job_cards = self.driver.find_elements(By.CLASS_NAME, "job_card")
+                page_jobs = self._parse_page(Portal.INTERNSHALA)
                 
-                for card in job_cards:
-                    try:
-                        job_info = {
-                            'title': card.find_element(By.CLASS_NAME, "job_title").text,
-                            'company': card.find_element(By.CLASS_NAME, "company_name").text,
-                            'location': card.find_element(By.CLASS_NAME, "location_link").text,
-                            'link': card.find_element(By.CLASS_NAME, "job_title").get_attribute('href')
-                        }
-                        if job_info not in jobs:
-                            jobs.append(job_info)
-                    except NoSuchElementException:
-                        continue
+                if self._collect_page(query, page_jobs, jobs, run_ids):
+                    break
             
+            self._record_run(query, run_ids, started_at)
             self.logger.info(f"Found {len(jobs)} jobs on Internshala")
             return jobs
             
@@ -217,9 +312,12 @@ class JobScraper:
             location (str): Job location
             
         Returns:
-            list: List of job dictionaries containing details
+            list: List of Job objects
         """
         try:
+            query = ('naukri', keywords, location)
+            started_at = time.time()
+            
             # Navigate to Naukri jobs page
             self.driver.get('https://www.naukri.com/')
             time.sleep(2)
@@ -241,27 +339,26 @@ class JobScraper:
             
             time.sleep(3)
             
+            # Only show postings since the last run in incremental mode
+            lookback = self._lookback_seconds(*query)
+            job_age = _round_up_days(lookback, NAUKRI_JOB_AGE_DAYS) if lookback else None
+            if job_age:
+                self.driver.get(_with_query_params(self.driver.current_url, jobAge=job_age))
+                time.sleep(3)
+            
             jobs = []
+            run_ids = set()
             # Scroll and collect job listings
             for _ in range(5):
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
                 time.sleep(2)
                 
-                job_cards = self.driver.find_elements(By.CLASS_NAME, "jobTuple")
+                page_jobs = self._parse_page(Portal.NAUKRI)
                 
-                for card in job_cards:
-                    try:
-                        job_info = {
-                            'title': card.find_element(By.CLASS_NAME, "title").text,
-                            'company': card.find_element(By.CLASS_NAME, "companyInfo").text,
-                            'location': card.find_element(By.CLASS_NAME, "location").text,
-                            'link': card.find_element(By.CLASS_NAME, "title").get_attribute('href')
-                        }
-                        if job_info not in jobs:
-                            jobs.append(job_info)
-                    except NoSuchElementException:
-                        continue
+                if self._collect_page(query, page_jobs, jobs, run_ids):
+                    break
             
+            self._record_run(query, run_ids, started_at)
             self.logger.info(f"Found {len(jobs)} jobs on Naukri")
             return jobs
             
@@ -274,13 +371,13 @@ class JobScraper:
         Save scraped jobs to a JSON file
         
         Args:
-            jobs (list): List of job dictionaries
+            jobs (list): List of Job objects
             filename (str): Name of file to save jobs to
         """
         try:
             Path('data').mkdir(exist_ok=True)
             with open(f'data/{filename}', 'w') as f:
-                json.dump(jobs, f, indent=4)
+                json.dump([job.to_dict() for job in jobs], f, indent=4)
             self.logger.info(f"Successfully saved {len(jobs)} jobs to {filename}")
         except Exception as e:
             self.logger.error(f"Error saving jobs to file: {str(e)}")
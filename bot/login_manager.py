@@ -8,12 +8,31 @@ import logging
 from pathlib import Path
 import time
 from selenium.webdriver.common.keys import Keys
+from bot.job import Portal
+
+LOGIN_METHODS = {
+    Portal.LINKEDIN: 'login_linkedin',
+    Portal.INDEED: 'login_indeed',
+    Portal.INTERNSHALA: 'login_internshala',
+    Portal.NAUKRI: 'login_naukri',
+}
 
 class LoginManager:
     def __init__(self, driver=None):
-        self.driver = driver or self._setup_driver()
+        self._driver = driver
         self._setup_logging()
 
+    @property
+    def driver(self):
+        """The browser, started on first use"""
+        if self._driver is None:
+            self._driver = self._setup_driver()
+        return self._driver
+
+    @driver.setter
+    def driver(self, driver):
+        self._driver = driver
+
     def _setup_driver(self):
         """Initialize and return a Chrome WebDriver instance"""
         options = webdriver.ChromeOptions()
@@ -265,5 +284,5 @@ class LoginManager:
 
     def close(self):
         """Close the browser and clean up"""
-        if self.driver:
-            self.driver.quit()
+        if self._driver:
+            self._driver.quit()
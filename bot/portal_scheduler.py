@@ -0,0 +1,246 @@
+from datetime import datetime, timezone
+import logging
+import math
+import time
+from bot.job import Portal
+
+class PortalAllocation:
+    """Share of the applications and browser time of one run granted to a portal"""
+
+    def __init__(self, scheduler, portal, applications, seconds):
+        self.scheduler = scheduler
+        self.portal = portal
+        self.applications = applications
+        self.seconds = seconds
+        self.applied = 0
+        self.started = time.time()
+
+    @property
+    def elapsed(self):
+        return time.time() - self.started
+
+    def exhausted(self):
+        """Check whether the portal used up its applications or its time"""
+        return self.applied >= self.applications or self.elapsed >= self.seconds
+
+    def record(self, success, duration, step_timings=None):
+        """Count one application attempt against the allocation"""
+        self.scheduler.record(self.portal, success, duration, step_timings)
+        if success:
+            self.applied += 1
+
+class PortalScheduler:
+    def __init__(self, portals, history=None, exploration=0.1, half_life_hours=72,
+                 prior_successes=1, prior_minutes=2):
+        """
+        Splits the daily application budget and browser time between portals by yield
+        
+        Yield is successful applications per minute spent applying,
+        computed from the application history with older outcomes
+        decaying by half every half_life_hours. Portals without history
+        start from an optimistic prior, and a fixed exploration share is
+        spread evenly so no portal is starved of the data it would need
+        to recover.
+        
+        Args:
+            portals (list): Portal values or Portal members to schedule
+            history (HistoryStore): Application history to learn from
+            exploration (float): Share of the budget spread evenly across portals
+            half_life_hours (float): Age at which an outcome counts half
+            prior_successes (float): Successes assumed for every portal
+            prior_minutes (float): Minutes of applying assumed for every portal
+        """
+        self.portals = [Portal(portal) for portal in portals]
+        self.history = history
+        self.exploration = exploration
+        self.half_life = half_life_hours * 3600
+        self.prior_successes = prior_successes
+        self.prior_minutes = prior_minutes
+        self._setup_logging()
+        self._stats = {portal: self._empty_stats() for portal in self.portals}
+        self._applied_today = 0
+        if history is not None:
+            self._load_history()
+
+    def _setup_logging(self):
+        """Setup logging configuration"""
+        logging.basicConfig(
+            filename='logs/history.log',
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def _empty_stats(self):
+        return {'attempts': 0.0, 'successes': 0.0, 'seconds': 0.0, 'steps': 0.0, 'step_seconds': 0.0}
+
+    def _add(self, portal, success, duration, step_timings, weight=1.0):
+        stats = self._stats[portal]
+        stats['attempts'] += weight
+        stats['successes'] += weight * bool(success)
+        stats['seconds'] += weight * (duration or 0)
+        if step_timings:
+            stats['steps'] += weight * len(step_timings)
+            stats['step_seconds'] += weight * sum(step_timings.values())
+
+    def _load_history(self):
+        """Fold past application outcomes into the per-portal stats"""
+        applications = self.history.applications()
+        if applications.num_rows == 0:
+            return
+        now = time.time()
+        midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        columns = applications.select(['applied_at', 'portal', 'success', 'duration', 'step_timings']).to_pydict()
+        for applied_at, portal, success, duration, step_timings in zip(*columns.values()):
+            # Stored as naive UTC
+            applied_at = applied_at.replace(tzinfo=timezone.utc).timestamp()
+            if success and applied_at >= midnight:
+                self._applied_today += 1
+            try:
+                portal = Portal(portal)
+            except ValueError:
+                continue
+            if portal not in self._stats:
+                continue
+            weight = math.pow(0.5, max(now - applied_at, 0) / self.half_life)
+            self._add(portal, success, duration, dict(step_timings or []), weight)
+
+    def applied_today(self):
+        """Successful applications since midnight, from history and this run"""
+        return self._applied_today
+
+    def record(self, portal, success, duration, step_timings=None):
+        """
+        Add the outcome of an application made during this run
+        
+        Args:
+            portal (Portal): Portal of the job
+            success (bool): Whether the application went through
+            duration (float): Seconds spent on the application
+            step_timings (dict): Seconds spent per apply step
+        """
+        if portal not in self._stats:
+            return
+        self._add(portal, success, duration, step_timings)
+        if success:
+            self._applied_today += 1
+
+    def stats(self):
+        """
+        Current yield, failure rate and step latency of every portal
+        
+        Returns:
+            dict: Per portal value, a dict of apps_per_minute, failure_rate,
+                  step_latency and the decayed attempt count
+        """
+        report = {}
+        for portal, stats in self._stats.items():
+            report[portal.value] = {
+                'attempts': round(stats['attempts'], 2),
+                'apps_per_minute': self._yield(portal),
+                'failure_rate': 1 - stats['successes'] / stats['attempts'] if stats['attempts'] else None,
+                'step_latency': stats['step_seconds'] / stats['steps'] if stats['steps'] else None,
+            }
+        return report
+
+    def _yield(self, portal):
+        """Successful applications per minute of applying, smoothed by the prior"""
+        stats = self._stats[portal]
+        return (stats['successes'] + self.prior_successes) / (stats['seconds'] / 60 + self.prior_minutes)
+
+    def shares(self, portals=None):
+        """
+        Fraction of the budget each portal should get
+        
+        Args:
+            portals (list): Portals to split between, defaults to all
+        
+        Returns:
+            dict: Portal to share, summing to 1
+        """
+        portals = portals if portals is not None else self.portals
+        if not portals:
+            return {}
+        yields = {portal: self._yield(portal) for portal in portals}
+        total = sum(yields.values())
+        return {
+            portal: (1 - self.exploration) * yields[portal] / total + self.exploration / len(portals)
+            for portal in portals
+        }
+
+    def order(self, portals=None):
+        """Portals by decreasing share, so the best one runs on the freshest browser"""
+        shares = self.shares(portals)
+        return sorted(shares, key=shares.get, reverse=True)
+
+    def allocate(self, total, portals=None):
+        """
+        Split a whole number of applications (or seconds) between portals
+        
+        Uses largest remainders, so the parts add up to exactly total.
+        
+        Returns:
+            dict: Portal to its part of total
+        """
+        shares = self.shares(portals)
+        exact = {portal: share * total for portal, share in shares.items()}
+        parts = {portal: int(value) for portal, value in exact.items()}
+        leftover = int(total) - sum(parts.values())
+        for portal in sorted(exact, key=lambda portal: exact[portal] - parts[portal], reverse=True)[:leftover]:
+            parts[portal] += 1
+        return parts
+
+    def grant(self, portal, applications, seconds, portals=None):
+        """
+        Allocate the next portal's part of the remaining budget
+        
+        Args:
+            portal (Portal): Portal about to run
+            applications (int): Applications left for this and the later portals
+            seconds (float): Browser time left for this and the later portals
+            portals (list): This and the later portals
+        
+        Returns:
+            PortalAllocation: The portal's applications and time
+        """
+        portals = portals or [portal]
+        allocation = PortalAllocation(
+            self, portal,
+            self.allocate(applications, portals)[portal],
+            seconds * self.shares(portals)[portal]
+        )
+        self.logger.info(
+            f"Allocated {allocation.applications} applications and {allocation.seconds / 60:.0f} minutes "
+            f"to {portal.value} (yield {self._yield(portal):.2f} applications/min)"
+        )
+        return allocation
+
+    def plan(self, jobs, budget):
+        """
+        Pick which jobs to apply to within a budget, split by portal yield
+        
+        Budget a portal cannot use for lack of jobs goes to the others.
+        Within each portal the input order is kept.
+        
+        Args:
+            jobs (list): Ranked Job objects
+            budget (int): Applications allowed
+        
+        Returns:
+            list: The chosen jobs, best-yielding portal first
+        """
+        by_portal = {}
+        for job in jobs:
+            if job.portal in self._stats:
+                by_portal.setdefault(job.portal, []).append(job)
+        
+        counts = dict.fromkeys(by_portal, 0)
+        portals = list(by_portal)
+        while budget > 0 and portals:
+            for portal, part in self.allocate(budget, portals).items():
+                take = min(part, len(by_portal[portal]) - counts[portal])
+                counts[portal] += take
+                budget -= take
+            portals = [portal for portal in portals if counts[portal] < len(by_portal[portal])]
+        
+        return [job for portal in self.order(list(counts)) for job in by_portal[portal][:counts[portal]]]
@@ -0,0 +1,281 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import Path
+import json
+import logging
+import queue
+import threading
+import time
+from bot.login_manager import LoginManager
+from bot.job_scraper import JobScraper
+from bot.job import Job
+
+# Search method and login method used for each supported portal. Portals
+# without a login method can be searched anonymously.
+PORTAL_SEARCH = {
+    'linkedin': ('search_linkedin_jobs', 'login_linkedin'),
+    'indeed': ('search_indeed_jobs', None),
+    'internshala': ('search_internshala_jobs', None),
+    'naukri': ('search_naukri_jobs', None),
+}
+
+def _as_list(value):
+    """Wrap a single config value in a list"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+class QueryCache:
+    def __init__(self, cache_file='data/query_cache.json', ttl=6 * 3600):
+        """
+        On-disk cache of search results per query
+        
+        Args:
+            cache_file (str): Path to JSON file holding cached results
+            ttl (int): Seconds a cached result stays valid
+        """
+        self.cache_file = Path(cache_file)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.entries = self._load()
+
+    def _load(self):
+        """Load cached results, starting empty if the cache is missing or unreadable"""
+        try:
+            with open(self.cache_file, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    @staticmethod
+    def key(portal, keywords, location):
+        """Build the cache key for a (portal, keywords, location) query"""
+        return f"{portal.lower()}|{keywords.strip().lower()}|{location.strip().lower()}"
+
+    def get(self, portal, keywords, location):
+        """
+        Get cached results for a query
+        
+        Returns:
+            list: Cached Job objects, or None if missing or older than the TTL
+        """
+        entry = self.entries.get(self.key(portal, keywords, location))
+        if not entry or time.time() - entry['fetched_at'] > self.ttl:
+            return None
+        return [Job.from_dict(job) for job in entry['jobs']]
+
+    def put(self, portal, keywords, location, jobs):
+        """Store the results of a query and write the cache to disk"""
+        with self._lock:
+            self.entries[self.key(portal, keywords, location)] = {
+                'fetched_at': time.time(),
+                'jobs': [job.to_dict() for job in jobs]
+            }
+            # Drop expired entries so the cache file does not grow forever
+            now = time.time()
+            self.entries = {
+                key: entry for key, entry in self.entries.items()
+                if now - entry['fetched_at'] <= self.ttl
+            }
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump(self.entries, f)
+            tmp_file.replace(self.cache_file)
+
+class DriverPool:
+    def __init__(self, size, credentials_file='config/credentials.json'):
+        """
+        Fixed-size pool of browser sessions shared by concurrent searches
+        
+        Browsers are started lazily, and each one logs in to a portal the
+        first time it is used for that portal.
+        
+        Args:
+            size (int): Maximum number of browsers running at once
+            credentials_file (str): Path to credentials JSON file
+        """
+        self.size = size
+        self.credentials_file = credentials_file
+        self._idle = queue.Queue()
+        self._managers = []
+        self._logged_in = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self, portal):
+        """
+        Borrow a browser session logged in to the given portal
+        
+        Yields:
+            LoginManager: Login manager owning the borrowed driver
+        """
+        manager = self._acquire()
+        try:
+            login_method = PORTAL_SEARCH[portal][1]
+            logged_in = self._logged_in[id(manager)]
+            if login_method and portal not in logged_in:
+                if not getattr(manager, login_method)(self.credentials_file):
+                    raise RuntimeError(f"Failed to login to {portal}")
+                logged_in.add(portal)
+            yield manager
+        finally:
+            self._idle.put(manager)
+
+    def _acquire(self):
+        """Take an idle session, starting a new browser if the pool is not full"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            start_new = len(self._managers) < self.size
+            if start_new:
+                manager = LoginManager()
+                self._managers.append(manager)
+                self._logged_in[id(manager)] = set()
+        if start_new:
+            return manager
+        return self._idle.get()
+
+    def close(self):
+        """Close every browser in the pool"""
+        for manager in self._managers:
+            try:
+                manager.close()
+            except Exception:
+                pass
+        self._managers = []
+
+class SearchMatrix:
+    def __init__(self, config, pool, cache=None, search_state=None, history=None, snapshots=None):
+        """
+        Runs every keywords x locations x portals query and merges the results
+        
+        Args:
+            config (dict): Bot configuration
+            pool (DriverPool): Browser sessions used to run the searches
+            cache (QueryCache): Optional cache of recent query results, not
+                                used in incremental mode
+            search_state (SearchState): Optional incremental search state
+            history (HistoryStore): Optional store recording every scraped job
+            snapshots (SnapshotStore): Optional store recording results pages
+        """
+        self.config = config
+        self.pool = pool
+        # A cached incremental result holds the jobs that were new on the
+        # earlier run, which would then be handed out a second time
+        self.cache = None if search_state else cache
+        self.search_state = search_state
+        self.history = history
+        self.snapshots = snapshots
+        self._setup_logging()
+
+    def _setup_logging(self):
+        """Setup logging configuration"""
+        logging.basicConfig(
+            filename='logs/scraper.log',
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def queries(self):
+        """
+        Build the list of queries from the search configuration
+        
+        Returns:
+            list: (portal, keywords, location) tuples
+        """
+        search = self.config['search']
+        keywords = _as_list(search['keywords'])
+        locations = _as_list(search.get('locations') or search['location'])
+        portals = _as_list(search.get('portals') or self.config.get('portals'))
+        portals = [portal for portal in portals if portal in PORTAL_SEARCH]
+        
+        return [
+            (portal, keyword, location)
+            for portal in portals
+            for keyword in keywords
+            for location in locations
+        ]
+
+    def _run_query(self, portal, keywords, location):
+        """Run one query, serving it from the cache when possible"""
+        if self.cache:
+            cached = self.cache.get(portal, keywords, location)
+            if cached is not None:
+                self.logger.info(f"Using cached results for {portal}: {keywords} in {location}")
+                return cached
+        
+        with self.pool.session(portal) as manager:
+            scraper = JobScraper(manager.driver, self.search_state, self.snapshots)
+            jobs = getattr(scraper, PORTAL_SEARCH[portal][0])(keywords, location)
+        
+        if self.history:
+            self.history.record_jobs(jobs)
+        
+        if self.cache:
+            self.cache.put(portal, keywords, location, jobs)
+        return jobs
+
+    def run(self):
+        """
+        Run all queries concurrently and merge the results
+        
+        Returns:
+            list: Deduplicated, ranked Job objects
+        """
+        queries = self.queries()
+        results = {}
+        
+        with ThreadPoolExecutor(max_workers=self.pool.size) as executor:
+            futures = {executor.submit(self._run_query, *query): query for query in queries}
+            for future in as_completed(futures):
+                query = futures[future]
+                try:
+                    results[query] = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error running search {query}: {str(e)}")
+        
+        # Merge in query order so ranking ties are stable between runs
+        merged = self.merge([(query, results[query]) for query in queries if query in results])
+        self.logger.info(f"Search matrix found {len(merged)} unique jobs across {len(queries)} queries")
+        return merged
+
+    def merge(self, query_results):
+        """
+        Merge per-query results into a single ranked candidate list
+        
+        Jobs are deduplicated by job ID. Jobs matched by more queries rank
+        higher, preferred companies get a bonus and blacklisted companies
+        are dropped.
+        
+        Args:
+            query_results (list): (query, jobs) pairs
+        
+        Returns:
+            list: Ranked Job objects with matched_queries filled in
+        """
+        blacklisted = {company.lower() for company in self.config.get('blacklisted_companies', [])}
+        preferred = {company.lower() for company in self.config.get('preferred_companies', [])}
+        
+        merged = {}
+        for (portal, keywords, location), jobs in query_results:
+            for job in jobs:
+                job = merged.setdefault(job.id, job)
+                if [keywords, location] not in job.matched_queries:
+                    job.matched_queries.append([keywords, location])
+        
+        def score(job):
+            return len(job.matched_queries) + (2 if job.company.lower() in preferred else 0)
+        
+        candidates = [
+            job for job in merged.values()
+            if job.company.lower() not in blacklisted
+        ]
+        candidates.sort(key=score, reverse=True)
+        return candidates
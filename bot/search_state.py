@@ -0,0 +1,130 @@
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+
+class SearchState:
+    def __init__(self, state_file='data/search_state.json', stop_ratio=0.8, max_ids=5000):
+        """
+        Persistent record of previous searches used for incremental scraping
+
+        Args:
+            state_file (str): Path to JSON file holding the search state
+            stop_ratio (float): Fraction of known IDs on a page at which
+                                pagination stops
+            max_ids (int): Maximum number of seen IDs remembered per query
+        """
+        self.state_file = Path(state_file)
+        self.stop_ratio = stop_ratio
+        self.max_ids = max_ids
+        self._setup_logging()
+        self.queries = self._load()
+        self._seen_cache = {}
+        self._lock = threading.Lock()
+
+    def _setup_logging(self):
+        """Setup logging configuration"""
+        logging.basicConfig(
+            filename='logs/scraper.log',
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def _load(self):
+        """Load the saved search state, starting empty if none exists"""
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.logger.error(f"Error loading search state: {str(e)}")
+            return {}
+
+    @staticmethod
+    def query_key(portal, keywords, location):
+        """Build the state key for a (portal, keywords, location) query"""
+        return f"{portal.lower()}|{keywords.strip().lower()}|{location.strip().lower()}"
+
+    def last_run(self, portal, keywords, location):
+        """
+        Get the time of the last completed run of a query
+
+        Returns:
+            float: Unix timestamp of the last run, or None if never run
+        """
+        entry = self.queries.get(self.query_key(portal, keywords, location))
+        return entry['last_run'] if entry else None
+
+    def seconds_since_last_run(self, portal, keywords, location):
+        """Seconds elapsed since the last run of a query, or None if never run"""
+        last_run = self.last_run(portal, keywords, location)
+        if last_run is None:
+            return None
+        return max(0, int(time.time() - last_run))
+
+    def seen_ids(self, portal, keywords, location):
+        """Get the set of job IDs already seen for a query"""
+        key = self.query_key(portal, keywords, location)
+        if key not in self._seen_cache:
+            entry = self.queries.get(key, {})
+            self._seen_cache[key] = set(entry.get('seen_ids', []))
+        return self._seen_cache[key]
+
+    def is_mostly_known(self, portal, keywords, location, job_ids):
+        """
+        Check whether a page of results is mostly jobs seen on earlier runs
+
+        Args:
+            job_ids (list): Job IDs found on the page
+
+        Returns:
+            bool: True if the share of known IDs reaches the stop ratio
+        """
+        if not job_ids:
+            return False
+        seen = self.seen_ids(portal, keywords, location)
+        if not seen:
+            return False
+        known = sum(1 for job_id in job_ids if job_id in seen)
+        return known / len(job_ids) >= self.stop_ratio
+
+    def record_run(self, portal, keywords, location, job_ids, started_at):
+        """
+        Record a completed run of a query and the job IDs it returned
+
+        Args:
+            job_ids (list): IDs of the jobs found during this run
+            started_at (float): Unix timestamp at which the run started
+        """
+        key = self.query_key(portal, keywords, location)
+        with self._lock:
+            self._record(key, job_ids, started_at)
+
+    def _record(self, key, job_ids, started_at):
+        """Merge a run's job IDs into the state entry for key and save"""
+        entry = self.queries.get(key, {'seen_ids': []})
+
+        # Keep the most recently seen IDs, newest last
+        new_ids = [job_id for job_id in job_ids if job_id]
+        new_set = set(new_ids)
+        seen_ids = [job_id for job_id in entry['seen_ids'] if job_id not in new_set] + new_ids
+        entry['seen_ids'] = seen_ids[-self.max_ids:]
+        entry['last_run'] = started_at
+
+        self.queries[key] = entry
+        self._seen_cache.pop(key, None)
+        self.save()
+
+    def save(self):
+        """Write the search state to disk"""
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.state_file.with_suffix('.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump(self.queries, f, indent=4)
+            tmp_file.replace(self.state_file)
+        except Exception as e:
+            self.logger.error(f"Error saving search state: {str(e)}")
@@ -0,0 +1,174 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from bot.job import Portal
+from bot.job_parser import SEARCH_PARSERS
+
+class SnapshotStore:
+    def __init__(self, root='data/snapshots'):
+        """
+        Content-addressed store of page sources captured during live runs
+        
+        Pages are gzip-compressed and stored under the SHA-256 of their
+        content, so identical pages are only stored once. An append-only
+        index records when and where each page was captured.
+        
+        Args:
+            root (str): Directory holding the snapshots
+        """
+        self.root = Path(root)
+        self.objects_dir = self.root / 'objects'
+        self.index_file = self.root / 'index.jsonl'
+        self._lock = threading.Lock()
+        self._setup_logging()
+
+    def _setup_logging(self):
+        """Setup logging configuration"""
+        logging.basicConfig(
+            filename='logs/snapshots.log',
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def _object_path(self, digest):
+        """Path of the stored object for a content hash"""
+        return self.objects_dir / digest[:2] / f"{digest}.html.gz"
+
+    def save(self, kind, portal, url, html):
+        """
+        Store a page source snapshot
+        
+        Args:
+            kind (str): 'search' for results pages, 'apply' for apply pages
+            portal (Portal): Portal the page belongs to
+            url (str): URL the page was loaded from
+            html (str): Page source
+        
+        Returns:
+            str: Content hash of the page, or None if it could not be saved
+        """
+        try:
+            data = html.encode('utf-8')
+            digest = hashlib.sha256(data).hexdigest()
+            path = self._object_path(digest)
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix('.tmp')
+                tmp_path.write_bytes(gzip.compress(data, compresslevel=6))
+                tmp_path.replace(path)
+            
+            entry = {
+                'hash': digest,
+                'kind': kind,
+                'portal': portal.value if isinstance(portal, Portal) else portal,
+                'url': url,
+                'captured_at': time.time()
+            }
+            with self._lock:
+                with open(self.index_file, 'a') as f:
+                    f.write(json.dumps(entry) + '\n')
+            return digest
+        
+        except Exception as e:
+            self.logger.error(f"Error saving snapshot of {url}: {str(e)}")
+            return None
+
+    def entries(self, kind=None, portal=None):
+        """
+        List the recorded snapshots
+        
+        Args:
+            kind (str): Only return snapshots of this kind
+            portal (str): Only return snapshots of this portal
+        
+        Returns:
+            list: Index entries, oldest first
+        """
+        try:
+            with open(self.index_file, 'r') as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+        return [
+            entry for entry in entries
+            if (kind is None or entry['kind'] == kind)
+            and (portal is None or entry['portal'] == portal)
+        ]
+
+    def load(self, digest):
+        """Get the page source stored under a content hash"""
+        return gzip.decompress(self._object_path(digest).read_bytes()).decode('utf-8')
+
+    def replay(self, portal=None, workers=None):
+        """
+        Re-run the search page parsers over every stored results page
+        
+        No browser is needed. Each distinct page is parsed once, in
+        parallel across processes.
+        
+        Args:
+            portal (str): Only replay snapshots of this portal
+            workers (int): Number of parser processes, defaults to CPU count
+        
+        Returns:
+            list: (entry, jobs) pairs, one per distinct page
+        """
+        unique = {}
+        for entry in self.entries(kind='search', portal=portal):
+            unique.setdefault(entry['hash'], entry)
+        entries = list(unique.values())
+        
+        tasks = [(str(self._object_path(entry['hash'])), entry['portal'], entry['url']) for entry in entries]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_parse_snapshot, tasks, chunksize=16))
+        return list(zip(entries, results))
+
+def _parse_snapshot(task):
+    """Parse one stored search page in a worker process"""
+    path, portal, url = task
+    html = gzip.decompress(Path(path).read_bytes()).decode('utf-8')
+    return SEARCH_PARSERS[Portal(portal)](html, url)
+
+def main(argv=None):
+    """Replay stored search pages through the parsers or show store stats"""
+    parser = argparse.ArgumentParser(description='Offline replay of captured job portal pages')
+    parser.add_argument('command', choices=['replay', 'stats'])
+    parser.add_argument('--portal', choices=[portal.value for portal in Portal])
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--output', help='Write the re-extracted jobs to this JSON file')
+    parser.add_argument('--snapshot-dir', default='data/snapshots')
+    args = parser.parse_args(argv)
+
+    store = SnapshotStore(args.snapshot_dir)
+
+    if args.command == 'stats':
+        entries = store.entries(portal=args.portal)
+        distinct = {entry['hash'] for entry in entries}
+        print(f"{len(entries)} captures, {len(distinct)} distinct pages")
+        for kind in ('search', 'apply'):
+            print(f"  {kind}: {len(store.entries(kind=kind, portal=args.portal))}")
+        return
+
+    started = time.time()
+    results = store.replay(portal=args.portal, workers=args.workers)
+    jobs = {}
+    for entry, page_jobs in results:
+        if not page_jobs:
+            print(f"No jobs parsed from {entry['portal']} page {entry['hash'][:12]} ({entry['url']})")
+        for job in page_jobs:
+            jobs.setdefault(job.id, job)
+    print(f"Parsed {len(results)} pages into {len(jobs)} unique jobs in {time.time() - started:.2f}s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump([job.to_dict() for job in jobs.values()], f, indent=4)
+
+if __name__ == '__main__':
+    main()
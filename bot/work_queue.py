@@ -0,0 +1,424 @@
+from datetime import datetime
+from multiprocessing import Process
+from pathlib import Path
+import argparse
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+from bot.job import Job, Portal
+
+QUEUED = 'queued'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+REVIEW = 'review'
+SKIPPED = 'skipped'
+
+# Stages reported from the submit click onwards; a job that reached one may
+# already have been submitted
+SUBMIT_STAGES = ('submitting', 'submit')
+_SUBMIT_STAGES_SQL = ', '.join(f"'{stage}'" for stage in SUBMIT_STAGES)
+
+class LeaseLost(Exception):
+    """Raised from a worker's progress callback once another worker owns the job"""
+
+class WorkQueue:
+    def __init__(self, db_path='data/work_queue.db', visibility_timeout=300, max_attempts=3):
+        """
+        Durable queue of jobs to apply to, shared by any number of worker processes
+        
+        Workers lease a job, apply, then ack or nack it. A lease expires
+        after visibility_timeout seconds without a heartbeat, so the job of
+        a crashed worker goes back to the queue. Jobs are keyed by their
+        canonical ID and are never enqueued twice.
+        
+        Retrying could submit an application twice if the worker died just
+        after clicking submit. Jobs whose last known step was 'submitting'
+        or later are therefore parked for review instead of being retried.
+        
+        Args:
+            db_path (str): SQLite database file
+            visibility_timeout (int): Seconds a lease lasts without a heartbeat
+            max_attempts (int): Leases of a job before it is marked as failed
+        """
+        self.db_path = Path(db_path)
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._setup_logging()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                stage TEXT,
+                lease_owner TEXT,
+                lease_expires REAL,
+                last_error TEXT,
+                enqueued_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires)')
+
+    def _setup_logging(self):
+        """Setup logging configuration"""
+        logging.basicConfig(
+            filename='logs/queue.log',
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def close(self):
+        self._conn.close()
+
+    def enqueue(self, jobs):
+        """
+        Add jobs to the queue, skipping any that were queued before
+        
+        Args:
+            jobs (list): List of Job objects
+        
+        Returns:
+            int: Number of jobs added
+        """
+        now = time.time()
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            added = 0
+            for job in jobs:
+                cursor = self._conn.execute(
+                    'INSERT OR IGNORE INTO jobs (id, payload, status, enqueued_at, updated_at) VALUES (?, ?, ?, ?, ?)',
+                    (job.id, json.dumps(job.to_dict()), QUEUED, now, now)
+                )
+                added += cursor.rowcount
+            self._conn.execute('COMMIT')
+        except Exception:
+            self._conn.execute('ROLLBACK')
+            raise
+        self.logger.info(f"Enqueued {added} of {len(jobs)} jobs")
+        return added
+
+    def _expire_leases(self, now):
+        """Settle expired leases that must not be handed out again"""
+        cursor = self._conn.execute(
+            "UPDATE jobs SET status = ?, lease_owner = NULL, updated_at = ?, "
+            "last_error = COALESCE(last_error, 'worker lost while submitting') "
+            f"WHERE status = ? AND lease_expires < ? AND stage IN ({_SUBMIT_STAGES_SQL})",
+            (REVIEW, now, LEASED, now)
+        )
+        if cursor.rowcount:
+            self.logger.warning(f"Parked {cursor.rowcount} jobs for review after losing their worker at submit")
+        cursor = self._conn.execute(
+            "UPDATE jobs SET status = ?, lease_owner = NULL, updated_at = ?, "
+            "last_error = COALESCE(last_error, 'lease expired') "
+            "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+            (FAILED, now, LEASED, now, self.max_attempts)
+        )
+        if cursor.rowcount:
+            self.logger.warning(f"Marked {cursor.rowcount} jobs as failed after {self.max_attempts} attempts")
+
+    def _quota_used(self, now):
+        """Jobs applied to since midnight plus those currently being applied to"""
+        midnight = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        return self._conn.execute(
+            'SELECT COUNT(*) FROM jobs WHERE (status = ? AND updated_at >= ?) OR (status = ? AND lease_expires >= ?)',
+            (DONE, midnight, LEASED, now)
+        ).fetchone()[0]
+
+    def applied_today(self):
+        """Jobs the queue has marked as applied since midnight"""
+        midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        return self._conn.execute(
+            'SELECT COUNT(*) FROM jobs WHERE status = ? AND updated_at >= ?', (DONE, midnight)
+        ).fetchone()[0]
+
+    def lease(self, worker_id, daily_limit=None):
+        """
+        Take the next job off the queue
+        
+        Args:
+            worker_id (str): Unique ID of the leasing worker
+            daily_limit (int): Applications the queue may make today; no job
+                               is leased once those done today and those
+                               leased right now reach it
+        
+        Returns:
+            Job: The leased job, or None if nothing is available right now
+        """
+        now = time.time()
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            self._expire_leases(now)
+            if daily_limit is not None and self._quota_used(now) >= daily_limit:
+                self._conn.execute('COMMIT')
+                return None
+            row = self._conn.execute(
+                'SELECT id, payload FROM jobs '
+                'WHERE status = ? OR (status = ? AND lease_expires < ?) '
+                'ORDER BY enqueued_at, rowid LIMIT 1',
+                (QUEUED, LEASED, now)
+            ).fetchone()
+            if row is None:
+                self._conn.execute('COMMIT')
+                return None
+            self._conn.execute(
+                'UPDATE jobs SET status = ?, attempts = attempts + 1, stage = NULL, lease_owner = ?, '
+                'lease_expires = ?, updated_at = ? WHERE id = ?',
+                (LEASED, worker_id, now + self.visibility_timeout, now, row[0])
+            )
+            self._conn.execute('COMMIT')
+        except Exception:
+            self._conn.execute('ROLLBACK')
+            raise
+        return Job.from_dict(json.loads(row[1]))
+
+    def heartbeat(self, job_id, worker_id, stage=None):
+        """
+        Extend a lease and record how far the application got
+        
+        Returns:
+            bool: False if the lease was lost to another worker
+        """
+        now = time.time()
+        cursor = self._conn.execute(
+            'UPDATE jobs SET lease_expires = ?, stage = COALESCE(?, stage), updated_at = ? '
+            'WHERE id = ? AND status = ? AND lease_owner = ?',
+            (now + self.visibility_timeout, stage, now, job_id, LEASED, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def ack(self, job_id, worker_id):
+        """Mark a leased job as applied"""
+        cursor = self._conn.execute(
+            'UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? '
+            'WHERE id = ? AND status = ? AND lease_owner = ?',
+            (DONE, time.time(), job_id, LEASED, worker_id)
+        )
+        if cursor.rowcount == 0:
+            self.logger.warning(f"Ack for {job_id} by {worker_id} arrived after its lease was lost")
+        return cursor.rowcount == 1
+
+    def nack(self, job_id, worker_id, error=None):
+        """
+        Give a leased job back after a failed application
+        
+        It is queued again unless it ran out of attempts, or parked for
+        review if it may already have been submitted.
+        """
+        now = time.time()
+        cursor = self._conn.execute(
+            'UPDATE jobs SET '
+            f"status = CASE WHEN stage IN ({_SUBMIT_STAGES_SQL}) THEN ? WHEN attempts >= ? THEN ? ELSE ? END, "
+            'lease_owner = NULL, lease_expires = NULL, last_error = ?, updated_at = ? '
+            'WHERE id = ? AND status = ? AND lease_owner = ?',
+            (REVIEW, self.max_attempts, FAILED, QUEUED, error, now, job_id, LEASED, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def skip(self, job_id, reason):
+        """Take a queued job out of the queue without applying, e.g. after a failed pre-check"""
+        cursor = self._conn.execute(
+            'UPDATE jobs SET status = ?, last_error = ?, updated_at = ? WHERE id = ? AND status = ?',
+            (SKIPPED, reason, time.time(), job_id, QUEUED)
+        )
+        return cursor.rowcount == 1
+
+    def requeue(self, status=REVIEW):
+        """Put every job with the given status back in the queue with fresh attempts"""
+        cursor = self._conn.execute(
+            'UPDATE jobs SET status = ?, attempts = 0, stage = NULL, updated_at = ? WHERE status = ?',
+            (QUEUED, time.time(), status)
+        )
+        return cursor.rowcount
+
+    def pending(self):
+        """Number of jobs that are queued or leased"""
+        return self._conn.execute(
+            'SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)', (QUEUED, LEASED)
+        ).fetchone()[0]
+
+    def stats(self):
+        """Number of jobs in each status"""
+        return dict(self._conn.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+
+    def jobs(self, status):
+        """List the jobs with a status along with their last error"""
+        rows = self._conn.execute(
+            'SELECT payload, attempts, last_error FROM jobs WHERE status = ? ORDER BY enqueued_at', (status,)
+        ).fetchall()
+        return [(Job.from_dict(json.loads(payload)), attempts, error) for payload, attempts, error in rows]
+
+def _apply_worker(index, config, credentials_file, db_path, poll_interval=5):
+    """
+    Worker process: drain the queue with a browser of its own
+
+    Imports Selenium-dependent modules here so the queue itself can be used
+    without a browser.
+    """
+    from bot.driver_supervisor import DriverSupervisor
+    from bot.history_store import HistoryStore
+    from bot.job_applicator import JobApplicator
+    from bot.login_manager import LoginManager, LOGIN_METHODS
+    from bot.portal_scheduler import PortalScheduler
+
+    queue_config = config.get('queue', {})
+    work_queue = WorkQueue(db_path, queue_config.get('visibility_timeout', 300), queue_config.get('max_attempts', 3))
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}"
+    logger = work_queue.logger
+    history = HistoryStore(config.get('history_dir', 'data/history'))
+    # Keep main's and the daemon's applications from earlier today within the daily cap
+    applied_elsewhere = max(PortalScheduler(list(Portal), history).applied_today() - work_queue.applied_today(), 0)
+    daily_limit = max(config.get('max_applications_per_day', 50) - applied_elsewhere, 0)
+
+    def progress(job, step):
+        # Stop before the next step, and above all before submitting, once
+        # the lease has expired and another worker may be applying
+        if not work_queue.heartbeat(job.id, worker_id, step):
+            raise LeaseLost(f"Lease on {job.id} lost at step {step}")
+        supervisor.progress(job, step)
+
+    def apply(job):
+        # Ack as soon as the application is in, before the supervisor's
+        # health checks and browser recycling, so a worker dying during
+        # those cannot leave an applied job to expire and be leased again
+        success = applicator.apply_job(job, config['resume_path'])
+        if success:
+            work_queue.ack(job.id, worker_id)
+        return success
+    
+    login_manager = LoginManager()
+    applicator = JobApplicator(login_manager.driver, history, progress=progress)
+    supervisor = DriverSupervisor(login_manager, credentials_file=credentials_file, **config.get('browser', {}))
+    supervisor.bind(applicator)
+    logged_in = set()
+    applied = 0
+
+    try:
+        while True:
+            job = work_queue.lease(worker_id, daily_limit)
+            if job is None:
+                # Leased jobs may still fail and free their share of the limit
+                if work_queue.applied_today() >= daily_limit:
+                    logger.info(f"Worker {worker_id} stopping at the daily limit of {daily_limit} queue applications")
+                    break
+                # Leases held by other workers may still expire and come back
+                if work_queue.pending() == 0:
+                    break
+                time.sleep(poll_interval)
+                continue
+            
+            if job.portal is None:
+                work_queue.nack(job.id, worker_id, 'unsupported portal')
+                continue
+            if job.portal not in logged_in:
+                if not getattr(login_manager, LOGIN_METHODS[job.portal])(credentials_file):
+                    work_queue.nack(job.id, worker_id, f"login to {job.portal.value} failed")
+                    continue
+                logged_in.add(job.portal)
+            
+            if supervisor.run(apply, job):
+                applied += 1
+            elif not work_queue.nack(job.id, worker_id, 'application failed'):
+                logger.warning(f"Worker {worker_id} lost the lease on {job.id} before finishing it")
+            time.sleep(config.get('application_delay', 5))
+        
+        logger.info(f"Worker {worker_id} finished after {applied} applications")
+    finally:
+        history.flush()
+        login_manager.close()
+        work_queue.close()
+
+def run_workers(config, credentials_file='config/credentials.json', workers=None, db_path=None):
+    """
+    Drain the queue with several worker processes, each with its own browser
+
+    Workers on other machines can share the queue as long as the database
+    file is on a filesystem with working locks.
+
+    Args:
+        config (dict): Bot configuration
+        credentials_file (str): Path to credentials JSON file
+        workers (int): Number of worker processes, defaults to queue.workers
+        db_path (str): Queue database, defaults to queue.db
+    """
+    queue_config = config.get('queue', {})
+    workers = workers or queue_config.get('workers', 2)
+    db_path = db_path or queue_config.get('db', 'data/work_queue.db')
+
+    processes = [
+        Process(target=_apply_worker, args=(index, config, credentials_file, db_path))
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+def bulk_apply(jobs_file, config, credentials_file='config/credentials.json', workers=None):
+    """
+    Queue every job of a saved jobs file and apply to them in parallel
+
+    Args:
+        jobs_file (str): Path to JSON file containing job listings
+        config (dict): Bot configuration
+        credentials_file (str): Path to credentials JSON file
+        workers (int): Number of worker processes
+    """
+    queue_config = config.get('queue', {})
+    with open(jobs_file, 'r') as f:
+        jobs = [Job.from_dict(job) for job in json.load(f)]
+    work_queue = WorkQueue(queue_config.get('db', 'data/work_queue.db'))
+    try:
+        work_queue.enqueue(jobs)
+    finally:
+        work_queue.close()
+    run_workers(config, credentials_file, workers)
+
+def main(argv=None):
+    """Enqueue jobs, run workers or inspect the work queue"""
+    parser = argparse.ArgumentParser(description='Durable job application queue')
+    parser.add_argument('command', choices=['enqueue', 'work', 'stats', 'review', 'requeue'])
+    parser.add_argument('jobs_file', nargs='?', help='Jobs JSON file for enqueue')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--status', default=REVIEW, help='Status to requeue')
+    parser.add_argument('--config', default='config/config.json')
+    args = parser.parse_args(argv)
+
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+    db_path = config.get('queue', {}).get('db', 'data/work_queue.db')
+
+    if args.command == 'work':
+        run_workers(config, workers=args.workers)
+        return
+    if args.command == 'enqueue' and not args.jobs_file:
+        parser.error('enqueue needs a jobs file')
+
+    work_queue = WorkQueue(db_path)
+    try:
+        if args.command == 'enqueue':
+            with open(args.jobs_file, 'r') as f:
+                jobs = [Job.from_dict(job) for job in json.load(f)]
+            print(f"Enqueued {work_queue.enqueue(jobs)} new jobs")
+        elif args.command == 'stats':
+            for status, count in sorted(work_queue.stats().items()):
+                print(f"{status}: {count}")
+        elif args.command == 'review':
+            for job, attempts, error in work_queue.jobs(REVIEW):
+                print(f"{job.url} ({attempts} attempts): {error}")
+        else:
+            print(f"Requeued {work_queue.requeue(args.status)} jobs")
+    finally:
+        work_queue.close()
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,8 @@
-from bot.login_manager import LoginManager
-from bot.job_scraper import JobScraper
-from bot.job_applicator import JobApplicator
+# Selenium, pyarrow and the HTTP stack are imported inside the functions
+# that need them, so commands that never open a browser start quickly
+from bot.search_state import SearchState
+from bot.job import Portal
+import argparse
 import logging
 from pathlib import Path
 import json
@@ -18,38 +20,188 @@ def setup_logging():
     )
     return logging.getLogger(__name__)
 
-def apply_to_linkedin(login_manager, config, logger):
-    """Handle LinkedIn job applications"""
+def load_config():
+    """Load the bot configuration"""
+    with open('config/config.json', 'r') as f:
+        return json.load(f)
+
+def load_history(config):
+    """Open the job and application history"""
+    from bot.history_store import HistoryStore
+    return HistoryStore(config.get('history_dir', 'data/history'))
+
+def load_search_state(config):
+    """Create the incremental search state if incremental mode is enabled"""
+    search_config = config['search']
+    if not search_config.get('incremental', False):
+        return None
+    return SearchState(
+        state_file=search_config.get('state_file', 'data/search_state.json'),
+        stop_ratio=search_config.get('incremental_stop_ratio', 0.8)
+    )
+
+def load_snapshots(config):
+    """Create the page snapshot recorder if snapshot recording is enabled"""
+    if not config.get('record_snapshots', False):
+        return None
+    from bot.snapshot_store import SnapshotStore
+    return SnapshotStore(config.get('snapshot_dir', 'data/snapshots'))
+
+def load_enricher(config):
+    """Create the job detail enricher if enrichment is enabled"""
+    enrichment_config = config.get('enrichment', {})
+    if not enrichment_config.get('enabled', False):
+        return None
+    from bot.enrichment import JobEnricher
+    return JobEnricher(
+        cache_dir=enrichment_config.get('cache_dir', 'data/details'),
+        max_workers=enrichment_config.get('max_workers', 8),
+        per_portal=enrichment_config.get('per_portal', 4),
+        max_age_hours=enrichment_config.get('max_age_hours', 24)
+    )
+
+def load_scheduler(config, portals, history):
+    """Create the scheduler that splits the daily budget between portals by yield"""
+    from bot.portal_scheduler import PortalScheduler
+    scheduler_config = config.get('scheduler', {})
+    return PortalScheduler(
+        portals, history,
+        exploration=scheduler_config.get('exploration', 0.1),
+        half_life_hours=scheduler_config.get('half_life_hours', 72)
+    )
+
+def queue_leftovers(config, jobs, logger):
+    """
+    Put jobs found but not applied to in the work queue
+    
+    In incremental mode the search state has already recorded them as
+    seen, so later searches would never return them again.
+    """
+    if not jobs:
+        return
+    from bot.work_queue import WorkQueue
+    work_queue = WorkQueue(config.get('queue', {}).get('db', 'data/work_queue.db'))
+    try:
+        added = work_queue.enqueue(jobs)
+    finally:
+        work_queue.close()
+    logger.info(f"Queued {added} jobs left over from this run for bulk-apply")
+
+def supervise(login_manager, config, login_method, *components):
+    """
+    Create a driver supervisor using the browser settings from config
+
+    In shared browser mode the supervisor watches the shared browser and
+    reopens the portal tabs when it is replaced; the components keep their
+    tab. Otherwise the components are rebound to the replacement driver.
+    """
+    from bot.browser_session import PortalTab
+    from bot.driver_supervisor import DriverSupervisor
+    driver = login_manager.driver
+    if isinstance(driver, PortalTab):
+        supervisor = DriverSupervisor(
+            driver.session.login_manager,
+            login_method=login_method,
+            credentials_file='config/credentials.json',
+            **config.get('browser', {})
+        )
+        supervisor.bind(driver.session)
+        return supervisor
+
+    supervisor = DriverSupervisor(
+        login_manager,
+        login_method=login_method,
+        credentials_file='config/credentials.json',
+        **config.get('browser', {})
+    )
+    supervisor.bind(*components)
+    return supervisor
+
+def uses_search_matrix(config):
+    """Check whether the config asks for more than one keywords/location query"""
+    search_config = config['search']
+    return not isinstance(search_config['keywords'], str) or 'locations' in search_config
+
+def run_search_matrix(config, logger, search_state=None, history=None, snapshots=None):
+    """
+    Run every keywords x locations x portals query concurrently
+
+    Returns:
+        list: Merged, ranked candidate jobs from all queries
+    """
+    from bot.job_scraper import JobScraper
+    from bot.search_matrix import SearchMatrix, DriverPool, QueryCache
+    search_config = config['search']
+    pool = DriverPool(search_config.get('max_workers', 2))
+    cache = QueryCache(ttl=search_config.get('cache_ttl_minutes', 360) * 60)
+    try:
+        candidates = SearchMatrix(config, pool, cache, search_state, history, snapshots).run()
+        enricher = load_enricher(config)
+        if enricher:
+            enricher.enrich(candidates)
+            enricher.close()
+        JobScraper(None).save_jobs(candidates, 'candidate_jobs.json')
+        logger.info(f"Search matrix produced {len(candidates)} candidate jobs")
+        return candidates
+    finally:
+        pool.close()
+
+def apply_to_linkedin(login_manager, config, logger, search_state=None, jobs=None, history=None, snapshots=None,
+                      allocation=None, leftover=None):
+    """
+    Handle LinkedIn job applications
+    
+    Jobs not applied to, because the allocation ran out or the attempt
+    failed before submitting, are added to the leftover list if given.
+    """
+    from bot.job_applicator import JobApplicator
+    from bot.job_scraper import JobScraper
     try:
         # Initialize job scraper
-        job_scraper = JobScraper(login_manager.driver)
+        job_scraper = JobScraper(login_manager.driver, search_state, snapshots)
         
-        # Search for jobs
-        linkedin_jobs = job_scraper.search_linkedin_jobs(
-            keywords=config['search']['keywords'],
-            location=config['search']['location']
-        )
+        # Search for jobs unless the search matrix already found them
+        if jobs is None:
+            linkedin_jobs = job_scraper.search_linkedin_jobs(
+                keywords=config['search']['keywords'],
+                location=config['search']['location']
+            )
+            if history:
+                history.record_jobs(linkedin_jobs)
+        else:
+            linkedin_jobs = jobs
         
         # Initialize job applicator
-        job_applicator = JobApplicator(login_manager.driver)
+        job_applicator = JobApplicator(login_manager.driver, history, snapshots)
+        
+        # Recycle or replace the browser between applications as needed
+        supervisor = supervise(login_manager, config, 'login_linkedin', job_scraper, job_applicator)
+        job_applicator.progress = supervisor.progress
         
         # Apply to each job
-        for job in linkedin_jobs:
+        for index, job in enumerate(linkedin_jobs):
+            if allocation and allocation.exhausted():
+                logger.info("LinkedIn allocation used up")
+                if leftover is not None:
+                    leftover.extend(linkedin_jobs[index:])
+                break
             try:
-                success = job_applicator.apply_linkedin_job(
-                    job_url=job['url'],
-                    resume_path=config['resume_path']
-                )
+                started = time.time()
+                success = supervisor.run(job_applicator.apply_job, job, config['resume_path'])
+                if allocation:
+                    allocation.record(success, time.time() - started, job_applicator.step_timings)
+                if not success and not supervisor.submitting and leftover is not None:
+                    leftover.append(job)
                 if success:
-                    logger.info(f"Successfully applied to job: {job['title']}")
+                    logger.info(f"Successfully applied to job: {job.title}")
                 else:
-                    logger.warning(f"Failed to apply to job: {job['title']}")
+                    logger.warning(f"Failed to apply to job: {job.title}")
                 
                 # Small delay between applications
                 time.sleep(2)
                 
             except Exception as e:
-                logger.error(f"Error applying to job {job['title']}: {str(e)}")
+                logger.error(f"Error applying to job {job.title}: {str(e)}")
                 continue
         
         # Save jobs to file
@@ -61,8 +213,16 @@ def apply_to_linkedin(login_manager, config, logger):
     finally:
         login_manager.close()
 
-def apply_to_indeed(login_manager, config, logger):
-    """Handle Indeed job applications"""
+def apply_to_indeed(login_manager, config, logger, search_state=None, jobs=None, history=None, snapshots=None,
+                    allocation=None, leftover=None):
+    """
+    Handle Indeed job applications
+    
+    Jobs not applied to, because the allocation ran out or the attempt
+    failed before submitting, are added to the leftover list if given.
+    """
+    from bot.job_applicator import JobApplicator
+    from bot.job_scraper import JobScraper
     try:
         # Login to Indeed
         if not login_manager.login_indeed('config/credentials.json'):
@@ -70,33 +230,49 @@ def apply_to_indeed(login_manager, config, logger):
             return
             
         # Initialize job scraper
-        job_scraper = JobScraper(login_manager.driver)
+        job_scraper = JobScraper(login_manager.driver, search_state, snapshots)
         
-        # Search for jobs on Indeed
-        indeed_jobs = job_scraper.search_indeed_jobs(
-            keywords=config['search']['keywords'],
-            location=config['search']['location']
-        )
+        # Search for jobs on Indeed unless the search matrix already found them
+        if jobs is None:
+            indeed_jobs = job_scraper.search_indeed_jobs(
+                keywords=config['search']['keywords'],
+                location=config['search']['location']
+            )
+            if history:
+                history.record_jobs(indeed_jobs)
+        else:
+            indeed_jobs = jobs
         
         # Initialize job applicator
-        job_applicator = JobApplicator(login_manager.driver)
+        job_applicator = JobApplicator(login_manager.driver, history, snapshots)
+        
+        # Recycle or replace the browser between applications as needed
+        supervisor = supervise(login_manager, config, 'login_indeed', job_scraper, job_applicator)
+        job_applicator.progress = supervisor.progress
         
         # Apply to each job
-        for job in indeed_jobs:
+        for index, job in enumerate(indeed_jobs):
+            if allocation and allocation.exhausted():
+                logger.info("Indeed allocation used up")
+                if leftover is not None:
+                    leftover.extend(indeed_jobs[index:])
+                break
             try:
-                success = job_applicator.apply_indeed_job(
-                    job_url=job['url'],
-                    resume_path=config['resume_path']
-                )
+                started = time.time()
+                success = supervisor.run(job_applicator.apply_job, job, config['resume_path'])
+                if allocation:
+                    allocation.record(success, time.time() - started, job_applicator.step_timings)
+                if not success and not supervisor.submitting and leftover is not None:
+                    leftover.append(job)
                 if success:
-                    logger.info(f"Successfully applied to Indeed job: {job['title']}")
+                    logger.info(f"Successfully applied to Indeed job: {job.title}")
                 else:
-                    logger.warning(f"Failed to apply to Indeed job: {job['title']}")
+                    logger.warning(f"Failed to apply to Indeed job: {job.title}")
                 
                 time.sleep(2)
                 
             except Exception as e:
-                logger.error(f"Error applying to Indeed job {job['title']}: {str(e)}")
+                logger.error(f"Error applying to Indeed job {job.title}: {str(e)}")
                 continue
         
         # Save jobs to file
@@ -108,30 +284,191 @@ def apply_to_indeed(login_manager, config, logger):
     finally:
         login_manager.close()
 
-def main():
+def run_apply(args):
+    """Search and apply on each portal, splitting the daily budget by yield"""
+    from bot.browser_session import BrowserSession
+    from bot.login_manager import LoginManager
     logger = setup_logging()
+    shared_browser = None
+    history = None
     
     try:
         # Load configuration
-        with open('config/config.json', 'r') as f:
-            config = json.load(f)
-        
-        # Process LinkedIn jobs
-        logger.info("Starting LinkedIn job applications...")
-        linkedin_manager = LoginManager()
-        if linkedin_manager.login_linkedin('config/credentials.json'):
-            apply_to_linkedin(linkedin_manager, config, logger)
-        
-        # Process Indeed jobs
-        logger.info("Starting Indeed job applications...")
-        indeed_manager = LoginManager()
-        if indeed_manager.login_indeed('config/credentials.json'):
-            apply_to_indeed(indeed_manager, config, logger)
+        config = load_config()
+        
+        search_state = load_search_state(config)
+        history = load_history(config)
+        snapshots = load_snapshots(config)
+        
+        # Run all configured queries up front when searching a query matrix
+        candidates = None
+        if uses_search_matrix(config):
+            logger.info("Running search matrix...")
+            candidates = run_search_matrix(config, logger, search_state, history, snapshots)
+        
+        def portal_jobs(portal):
+            if candidates is None:
+                return None
+            return [job for job in candidates if job.portal == portal]
+        
+        # Optionally host every portal in a tab of one warm browser
+        shared_browser = BrowserSession() if config.get('shared_browser', False) else None
+        
+        def portal_login_manager(portal):
+            if shared_browser:
+                return shared_browser.login_manager_for(portal)
+            return LoginManager()
+        
+        # Run the portals with the best recent yield first and give them
+        # the largest share of today's applications and of the session time
+        portal_runs = {
+            Portal.LINKEDIN: ('login_linkedin', apply_to_linkedin),
+            Portal.INDEED: ('login_indeed', apply_to_indeed),
+        }
+        scheduler = load_scheduler(config, list(portal_runs), history)
+        applications_left = config.get('max_applications_per_day', 50) - scheduler.applied_today()
+        seconds_left = config.get('scheduler', {}).get('session_minutes', 120) * 60
+        remaining = scheduler.order()
+        leftover = []
+        
+        while remaining and applications_left > 0 and seconds_left > 0:
+            portal = remaining[0]
+            allocation = scheduler.grant(portal, applications_left, seconds_left, remaining)
+            login_method, apply_to_portal = portal_runs[portal]
+            
+            logger.info(f"Starting {portal.value} job applications...")
+            login_manager = portal_login_manager(portal)
+            if getattr(login_manager, login_method)('config/credentials.json'):
+                apply_to_portal(login_manager, config, logger, search_state, portal_jobs(portal), history, snapshots,
+                                allocation, leftover)
+            else:
+                leftover.extend(portal_jobs(portal) or [])
             
+            # Whatever this portal did not use goes to the remaining ones
+            applications_left -= allocation.applied
+            seconds_left -= allocation.elapsed
+            remaining = scheduler.order(remaining[1:])
+        
+        # Portals the budget did not reach still found jobs in a matrix search,
+        # and jobs from portals without a run here are left to the queue
+        # workers, which apply on every portal
+        for portal in remaining:
+            leftover.extend(portal_jobs(portal) or [])
+        if candidates is not None:
+            leftover.extend(job for job in candidates if job.portal not in portal_runs)
+        if search_state:
+            queue_leftovers(config, leftover, logger)
+        
+        logger.info(f"Portal yields: {scheduler.stats()}")
         logger.info("All job application processes completed")
         
     except Exception as e:
         logger.error(f"Error in main process: {str(e)}")
+    finally:
+        # Write out buffered application outcomes even if the run failed
+        if history:
+            history.flush()
+        if shared_browser:
+            shared_browser.close()
+
+def run_search(args):
+    """Search every configured query and save the candidates without applying"""
+    logger = setup_logging()
+    config = load_config()
+    history = load_history(config)
+    
+    try:
+        candidates = run_search_matrix(config, logger, load_search_state(config), history, load_snapshots(config))
+    finally:
+        history.flush()
+    print(f"Saved {len(candidates)} candidate jobs to data/candidate_jobs.json")
+
+def run_bulk_apply(args):
+    """Queue a saved jobs file and apply to it with parallel workers"""
+    from bot.work_queue import bulk_apply
+    setup_logging()
+    bulk_apply(args.jobs_file, load_config(), workers=args.workers)
+
+def show_stats(args):
+    """Print application success rates, portal yields and the work queue"""
+    config = load_config()
+    history = load_history(config)
+    
+    success_rate = history.success_rate(by=args.by)
+    print(success_rate.to_string(index=False) if len(success_rate) else "No applications recorded yet")
+    
+    scheduler = load_scheduler(config, config.get('portals', [portal.value for portal in Portal]), history)
+    print(f"\nApplied today: {scheduler.applied_today()}")
+    for portal, stats in scheduler.stats().items():
+        failure_rate = 'n/a' if stats['failure_rate'] is None else f"{stats['failure_rate']:.0%}"
+        print(f"  {portal}: {stats['apps_per_minute']:.2f} applications/min, {failure_rate} failed")
+    
+    queue_db = config.get('queue', {}).get('db', 'data/work_queue.db')
+    if Path(queue_db).exists():
+        from bot.work_queue import WorkQueue
+        work_queue = WorkQueue(queue_db)
+        print(f"\nWork queue: {work_queue.stats()}")
+        work_queue.close()
+
+def export_history(args):
+    """Write the job or application history to a CSV or JSON file"""
+    history = load_history(load_config())
+    table = history.jobs() if args.table == 'jobs' else history.applications()
+    df = table.to_pandas()
+    if args.output.endswith('.json'):
+        df.to_json(args.output, orient='records', date_format='iso', indent=4)
+    else:
+        df.to_csv(args.output, index=False)
+    print(f"Exported {len(df)} {args.table} to {args.output}")
+
+def run_daemon(args):
+    """Run the bot as a long-lived daemon with a warm browser and a local control API"""
+    from bot.daemon import JobDaemon
+    logger = setup_logging()
+    config = load_config()
+    
+    logger.info("Starting job application daemon...")
+    daemon = JobDaemon(
+        config,
+        credentials_file='config/credentials.json',
+        search_state=load_search_state(config),
+        history=load_history(config),
+        snapshots=load_snapshots(config),
+        enricher=load_enricher(config)
+    )
+    daemon.serve()
+
+def build_parser():
+    """Command line interface, one subcommand per task"""
+    parser = argparse.ArgumentParser(description='Automated job application bot')
+    subparsers = parser.add_subparsers(dest='command')
+    
+    subparsers.add_parser('apply', help='Search and apply on each portal (default)').set_defaults(handler=run_apply)
+    subparsers.add_parser('search', help='Search and save candidate jobs without applying').set_defaults(
+        handler=run_search)
+    
+    bulk_parser = subparsers.add_parser('bulk-apply', help='Apply to a saved jobs file with parallel workers')
+    bulk_parser.add_argument('jobs_file', nargs='?', default='data/candidate_jobs.json')
+    bulk_parser.add_argument('--workers', type=int, help='Worker processes, each with its own browser')
+    bulk_parser.set_defaults(handler=run_bulk_apply)
+    
+    stats_parser = subparsers.add_parser('stats', help='Show success rates, portal yields and the work queue')
+    stats_parser.add_argument('--by', choices=['portal', 'company'], default='portal')
+    stats_parser.set_defaults(handler=show_stats)
+    
+    export_parser = subparsers.add_parser('export', help='Export the job or application history')
+    export_parser.add_argument('table', choices=['jobs', 'applications'])
+    export_parser.add_argument('output', help='Output file, .csv or .json')
+    export_parser.set_defaults(handler=export_history)
+    
+    subparsers.add_parser('daemon', help='Keep running with a warm browser and a local control API').set_defaults(
+        handler=run_daemon)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    handler = getattr(args, 'handler', run_apply)
+    handler(args)
 
 if __name__ == "__main__":
     main()
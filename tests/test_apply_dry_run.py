@@ -0,0 +1,106 @@
+import pytest
+from bot import job_applicator
+from bot.apply_validator import verdict
+from bot.job import Job
+from bot.job_applicator import JobApplicator
+
+FORM_FIELDS = [
+    {'name': 'resume', 'type': 'file', 'label': '', 'required': False, 'filled': False},
+    {'name': 'availability', 'type': 'select-one', 'label': 'Confirm your availability', 'required': True,
+     'filled': True},
+    {'name': 'notice', 'type': 'text', 'label': 'Notice period', 'required': True, 'filled': False},
+]
+
+class FakeElement:
+    def __init__(self, driver, name):
+        self.driver = driver
+        self.name = name
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def send_keys(self, value):
+        pass
+
+    def click(self):
+        self.driver.clicked.append(self.name)
+
+class FakeDriver:
+    """Just enough WebDriver for the Internshala apply flow"""
+
+    current_url = 'https://internshala.com/job/detail/data-analyst-job-at-fixture-co1234567'
+    page_source = '<html></html>'
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.clicked = []
+
+    def get(self, url):
+        pass
+
+    def find_element(self, by, value):
+        return FakeElement(self, value)
+
+    def execute_script(self, script, *args):
+        return self.fields
+
+class FailingHistory:
+    def record_application(self, *args, **kwargs):
+        raise AssertionError('dry runs must not be recorded as applications')
+
+@pytest.fixture(autouse=True)
+def sandbox(tmp_path, monkeypatch):
+    # The applicator logs to logs/applicator.log and sleeps between steps
+    (tmp_path / 'logs').mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(job_applicator.time, 'sleep', lambda seconds: None)
+
+def _job():
+    return Job(title='Data Analyst', company='Fixture Co', url=FakeDriver.current_url)
+
+def test_dry_run_stops_before_submit():
+    driver = FakeDriver(FORM_FIELDS)
+    applicator = JobApplicator(driver, history=FailingHistory(), dry_run=True)
+
+    assert applicator.apply_job(_job(), '/tmp/resume.pdf')
+    assert 'submit_application' not in driver.clicked
+
+    result = applicator.dry_run_result
+    assert result['reached_submit']
+    assert result['portal'] == 'internshala'
+    assert list(result['step_timings']) == ['open_listing', 'resume', 'review']
+    assert result['field_map']['review'] == FORM_FIELDS
+    assert [field['name'] for field in result['manual_fields']] == ['notice']
+
+def test_live_run_clicks_submit():
+    driver = FakeDriver(FORM_FIELDS)
+    applicator = JobApplicator(driver)
+
+    assert applicator.apply_job(_job(), '/tmp/resume.pdf')
+    assert driver.clicked[-1] == 'submit_application'
+    assert applicator.dry_run_result is None
+
+def test_manual_fields_counts_answered_radio_groups():
+    applicator = JobApplicator(FakeDriver([]), dry_run=True)
+    fields = [
+        {'name': 'authorized', 'type': 'radio', 'label': 'Yes', 'required': True, 'filled': False},
+        {'name': 'authorized', 'type': 'radio', 'label': 'No', 'required': True, 'filled': True},
+        {'name': 'relocate', 'type': 'radio', 'label': 'Yes', 'required': True, 'filled': False},
+        {'name': 'relocate', 'type': 'radio', 'label': 'No', 'required': True, 'filled': False},
+        {'name': 'cover', 'type': 'textarea', 'label': '', 'required': False, 'filled': False},
+    ]
+
+    assert [field['name'] for field in applicator._manual_fields(fields)] == ['relocate', 'relocate']
+
+@pytest.mark.parametrize('result, expected', [
+    ({'reached_submit': True, 'manual_fields': [], 'duration': 10}, 'ok'),
+    ({'reached_submit': True, 'manual_fields': [FORM_FIELDS[2]], 'duration': 10}, 'manual_fields'),
+    ({'reached_submit': True, 'manual_fields': [], 'duration': 120}, 'timeout'),
+    ({'reached_submit': False, 'manual_fields': [], 'duration': 10}, 'failed'),
+    ({'reached_submit': False, 'manual_fields': [], 'duration': 0, 'error': 'login failed'}, 'failed'),
+])
+def test_verdict(result, expected):
+    assert verdict(result, max_seconds=90) == expected
@@ -0,0 +1,113 @@
+import pytest
+from selenium.common.exceptions import WebDriverException
+from bot import driver_supervisor
+from bot.driver_supervisor import DriverSupervisor
+
+class FakeDriver:
+    def __init__(self):
+        self.alive = True
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise WebDriverException('browser gone')
+        return 1
+
+    def set_page_load_timeout(self, seconds):
+        pass
+
+    def set_script_timeout(self, seconds):
+        pass
+
+    def execute_cdp_cmd(self, command, params):
+        return {'cookies': []}
+
+    def quit(self):
+        self.alive = False
+
+class FakeLoginManager:
+    def __init__(self):
+        self.driver = FakeDriver()
+        self.started = 1
+
+    def _setup_driver(self):
+        self.started += 1
+        return FakeDriver()
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(tmp_path, monkeypatch):
+    # The supervisor logs to logs/login.log
+    (tmp_path / 'logs').mkdir()
+    monkeypatch.chdir(tmp_path)
+    clock = Clock()
+    monkeypatch.setattr(driver_supervisor.time, 'time', clock)
+    return clock
+
+@pytest.fixture
+def supervisor(clock):
+    return DriverSupervisor(FakeLoginManager(), recycle_after_applications=1000, slowdown_factor=2.0)
+
+def _wizard(supervisor, clock, steps):
+    """Stand-in for an apply method reporting (step, seconds) pairs"""
+    def apply():
+        for step, seconds in steps:
+            clock.now += seconds
+            supervisor.progress(None, step)
+        return True
+    return apply
+
+def test_success_is_not_retried_when_the_browser_dies_afterwards(supervisor):
+    calls = []
+
+    def apply():
+        calls.append(1)
+        supervisor.driver.alive = False
+        return True
+
+    assert supervisor.run(apply)
+    assert len(calls) == 1
+    assert supervisor.login_manager.started == 2
+
+def test_failure_after_submitting_is_not_retried(supervisor):
+    calls = []
+
+    def apply():
+        calls.append(1)
+        supervisor.progress(None, 'submitting')
+        supervisor.driver.alive = False
+        return False
+
+    assert not supervisor.run(apply)
+    assert len(calls) == 1
+
+def test_failure_before_submitting_is_retried_once(supervisor):
+    calls = []
+
+    def apply():
+        calls.append(1)
+        supervisor.driver.alive = False
+        return False
+
+    supervisor.run(apply)
+    assert len(calls) == 2
+
+def test_longer_wizards_are_not_a_slowdown(supervisor, clock):
+    short = [('open_listing', 2), ('resume', 3)]
+    long = [('open_listing', 2), ('contact_info', 3), ('resume', 3), ('questions', 8), ('review', 3)]
+    for steps in [short] * 3 + [long] * 4:
+        supervisor.run(_wizard(supervisor, clock, steps))
+    assert not supervisor._is_slow()
+    assert supervisor.login_manager.started == 1
+
+def test_slower_steps_trigger_a_recycle(supervisor, clock):
+    for seconds in [2, 2, 2, 2, 5, 6]:
+        supervisor.run(_wizard(supervisor, clock, [('open_listing', seconds), ('resume', seconds)]))
+    assert supervisor.login_manager.started == 2
+    # The fresh browser starts a new baseline
+    assert supervisor.latencies == {}
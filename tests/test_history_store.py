@@ -0,0 +1,56 @@
+import pytest
+from bot.history_store import HistoryStore
+from bot.job import Job
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # The store logs to logs/history.log
+    (tmp_path / 'logs').mkdir()
+    monkeypatch.chdir(tmp_path)
+    return HistoryStore(str(tmp_path / 'history'), batch_size=2, jobs_batch_size=10, max_parts=4)
+
+def _jobs(start, count):
+    return [
+        Job(title=f"Data Analyst {index}", company='Fixture Co', url=f"https://www.linkedin.com/jobs/view/{index}")
+        for index in range(start, start + count)
+    ]
+
+def test_scraped_jobs_are_buffered_until_flush(store):
+    store.record_jobs(_jobs(0, 3))
+    assert store.jobs().num_rows == 0
+    store.flush()
+    assert store.jobs().num_rows == 3
+
+def test_scraped_jobs_are_written_once_the_batch_fills(store):
+    store.record_jobs(_jobs(0, 6))
+    store.record_jobs(_jobs(6, 6))
+    assert store.jobs().num_rows == 12
+    assert len(store._parts('jobs')) == 1
+
+def test_parts_are_compacted_automatically(store):
+    for run in range(20):
+        store.record_jobs(_jobs(run * 3, 3))
+        store.flush()
+        assert len(store._parts('jobs')) <= store.max_parts
+    jobs = store.jobs()
+    assert jobs.num_rows == 60
+    assert sorted(jobs['job_id'].to_pylist()) == sorted(job.id for job in _jobs(0, 60))
+
+def test_application_outcomes_survive_compaction(store):
+    for index, job in enumerate(_jobs(0, 20)):
+        store.record_application(job, index % 2 == 0, 1_700_000_000 + index, {'resume': 1.5},
+                                 None if index % 2 == 0 else 'Error applying to job: timeout')
+    store.flush()
+    assert len(store._parts('applications')) <= store.max_parts
+    applications = store.applications()
+    assert applications.num_rows == 20
+    assert applications['error'].null_count == 10
+
+def test_compact_merges_everything_into_one_part(store):
+    for run in range(3):
+        store.record_jobs(_jobs(run * 3, 3))
+        store.flush()
+    store.compact()
+    assert len(store._parts('jobs')) == 1
+    assert store.jobs().num_rows == 9
+    assert not (store.root / 'jobs' / 'compact.lock').exists()
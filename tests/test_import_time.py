@@ -0,0 +1,38 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Importing main must stay cheap: the heavy dependencies are imported by
+# the subcommands that need them
+HEAVY_MODULES = ['selenium', 'pyarrow', 'requests', 'pandas', 'bs4']
+IMPORT_BUDGET_SECONDS = 0.5
+
+PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    'seconds': elapsed,
+    'loaded': [name for name in {HEAVY_MODULES!r} if name in sys.modules],
+}}))
+"""
+
+def _import_main():
+    """Import main in a fresh interpreter and report what it cost"""
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def test_import_main_skips_heavy_dependencies():
+    assert _import_main()['loaded'] == []
+
+def test_import_main_within_budget():
+    # Best of three, so a slow first disk read doesn't fail the test
+    seconds = min(_import_main()['seconds'] for _ in range(3))
+    assert seconds < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,123 @@
+import time
+import pytest
+from bot import work_queue as work_queue_module
+from bot.job import Job
+from bot.work_queue import WorkQueue, QUEUED, LEASED, DONE, FAILED, REVIEW
+
+class Clock:
+    """Stands in for time.time so leases can expire without waiting"""
+
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(tmp_path, monkeypatch):
+    # The queue logs to logs/queue.log
+    (tmp_path / 'logs').mkdir()
+    monkeypatch.chdir(tmp_path)
+    clock = Clock()
+    monkeypatch.setattr(work_queue_module.time, 'time', clock)
+    return clock
+
+@pytest.fixture
+def queue(clock, tmp_path):
+    work_queue = WorkQueue(str(tmp_path / 'queue.db'), visibility_timeout=60, max_attempts=2)
+    yield work_queue
+    work_queue.close()
+
+def _jobs(count):
+    return [
+        Job(title=f"Data Analyst {index}", company='Fixture Co', url=f"https://www.linkedin.com/jobs/view/{index}")
+        for index in range(count)
+    ]
+
+def _status(queue, job):
+    return queue._conn.execute('SELECT status FROM jobs WHERE id = ?', (job.id,)).fetchone()[0]
+
+def test_enqueue_skips_known_jobs(queue):
+    jobs = _jobs(3)
+    assert queue.enqueue(jobs) == 3
+    assert queue.enqueue(jobs + _jobs(4)[3:]) == 1
+    assert queue.stats() == {QUEUED: 4}
+
+def test_lease_hands_out_each_job_once(queue):
+    queue.enqueue(_jobs(2))
+    first = queue.lease('w1')
+    second = queue.lease('w2')
+    assert {first.id, second.id} == {job.id for job in _jobs(2)}
+    assert queue.lease('w3') is None
+
+def test_expired_lease_goes_to_another_worker(queue, clock):
+    job, = _jobs(1)
+    queue.enqueue([job])
+    queue.lease('w1')
+    assert queue.heartbeat(job.id, 'w1', 'resume')
+
+    clock.now += 61
+    assert queue.lease('w2').id == job.id
+    # The first worker must notice it no longer owns the job
+    assert not queue.heartbeat(job.id, 'w1', 'questions')
+    assert not queue.ack(job.id, 'w1')
+
+def test_heartbeat_keeps_the_lease(queue, clock):
+    job, = _jobs(1)
+    queue.enqueue([job])
+    queue.lease('w1')
+    clock.now += 50
+    assert queue.heartbeat(job.id, 'w1', 'resume')
+    clock.now += 50
+    assert queue.lease('w2') is None
+
+@pytest.mark.parametrize('stage', ['submitting', 'submit'])
+def test_expired_lease_after_submit_click_is_parked_for_review(queue, clock, stage):
+    job, = _jobs(1)
+    queue.enqueue([job])
+    queue.lease('w1')
+    queue.heartbeat(job.id, 'w1', 'submitting')
+    queue.heartbeat(job.id, 'w1', stage)
+
+    clock.now += 61
+    assert queue.lease('w2') is None
+    assert _status(queue, job) == REVIEW
+
+def test_nack_requeues_until_attempts_run_out(queue):
+    job, = _jobs(1)
+    queue.enqueue([job])
+    queue.lease('w1')
+    assert queue.nack(job.id, 'w1', 'application failed')
+    assert _status(queue, job) == QUEUED
+
+    queue.lease('w1')
+    queue.nack(job.id, 'w1', 'application failed')
+    assert _status(queue, job) == FAILED
+
+@pytest.mark.parametrize('stage', ['submitting', 'submit'])
+def test_nack_after_submit_click_is_parked_for_review(queue, stage):
+    job, = _jobs(1)
+    queue.enqueue([job])
+    queue.lease('w1')
+    queue.heartbeat(job.id, 'w1', stage)
+    queue.nack(job.id, 'w1', 'application failed')
+    assert _status(queue, job) == REVIEW
+
+    assert queue.requeue(REVIEW) == 1
+    assert _status(queue, job) == QUEUED
+
+def test_ack_marks_done(queue):
+    job, = _jobs(1)
+    queue.enqueue([job])
+    queue.lease('w1')
+    assert queue.ack(job.id, 'w1')
+    assert _status(queue, job) == DONE
+    assert queue.applied_today() == 1
+
+def test_daily_limit_counts_done_and_leased_jobs(queue):
+    jobs = _jobs(4)
+    queue.enqueue(jobs)
+    done = queue.lease('w1', daily_limit=2)
+    queue.ack(done.id, 'w1')
+    assert _status(queue, queue.lease('w1', daily_limit=2)) == LEASED
+    assert queue.lease('w2', daily_limit=2) is None